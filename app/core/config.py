@@ -14,13 +14,65 @@ class Settings(BaseSettings):
     BOT_TOKEN: str
     SUPER_ADMIN: int
 
+    # Логирование: уровень файла logfile.log и запись через фоновую очередь
+    LOG_LEVEL: str = "DEBUG"
+    LOG_ENQUEUE: bool = False
+
     # Интервалы планировщика (в секундах)
     PARSE_TASK_INTERVAL_SEC: int = 10
     NOTIFY_TASK_INTERVAL_SEC: int = 10
 
+    # Параллельный опрос каналов: воркеров на один Telethon-клиент и таймаут на канал
+    PARSE_CHANNEL_CONCURRENCY: int = 4
+    PARSE_CHANNEL_TIMEOUT_SEC: int = 60
+
+    # Адаптивный опрос: границы интервала между опросами одного канала
+    PARSE_POLL_MIN_INTERVAL_SEC: int = 10
+    PARSE_POLL_MAX_INTERVAL_SEC: int = 1800
+
+    # Сопоставление ключевых слов в пуле процессов (0 — в event loop); пачка задачи и минимальный объём
+    PARSE_MATCH_PROCESSES: int = 0
+    PARSE_MATCH_BATCH_SIZE: int = 200
+    PARSE_MATCH_POOL_MIN_MESSAGES: int = 50
+
+    # Пул Telethon-клиентов: период проверки сессии и максимальная пауза переподключения
+    TELETHON_HEALTHCHECK_SEC: int = 300
+    TELETHON_RECONNECT_BACKOFF_MAX_SEC: int = 300
+
+    # Приём сообщений событиями NewMessage/MessageEdited; опрос каналов с событиями — раз в N секунд
+    PARSE_REALTIME_ENABLED: bool = True
+    PARSE_REALTIME_GAP_FILL_SEC: int = 300
+
+    # Кэш получателей PostProcessing (операторы + админы); сбрасывается при смене ролей,
+    # TTL страхует от правок пользователей напрямую в БД
+    RECIPIENTS_CACHE_TTL_SEC: int = 300
+
     # Окно актуальности постов для уведомлений (в часах)
     NOTIFY_LOOKBACK_HOURS: int = 72
 
+    # Очередь уведомлений: размер захватываемой пачки, аренда пачки и лимит попыток отправки;
+    # записей одного получателя в работе одновременно (при 1 сообщении/с в чат — секунд отправки)
+    NOTIFY_BATCH_SIZE: int = 100
+    NOTIFY_LEASE_SEC: int = 120
+    NOTIFY_PER_CHAT_BATCH: int = 20
+    NOTIFY_MAX_ATTEMPTS: int = 5
+
+    # Лимиты Bot API для рассылки: сообщений в секунду всего и в один чат, одновременных запросов
+    NOTIFY_GLOBAL_RATE: float = 30
+    NOTIFY_PER_CHAT_RATE: float = 1
+    NOTIFY_SEND_CONCURRENCY: int = 10
+
+    # LISTEN/NOTIFY: рассыльщик просыпается сразу после записи новых уведомлений
+    NOTIFY_LISTEN_ENABLED: bool = True
+
+    # Почасовые счётчики отчётов: период компактора и часов на транзакцию; False — отчёт считается по сырым таблицам
+    REPORT_ROLLUP_ENABLED: bool = True
+    REPORT_ROLLUP_INTERVAL_SEC: int = 60
+    REPORT_ROLLUP_CHUNK_HOURS: int = 24
+
+    # Готовый .docx-отчёт переиспользуется для того же окна, языка и TZ в течение N секунд
+    REPORT_DOCX_CACHE_TTL_SEC: int = 60
+
     @property
     def db_url(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
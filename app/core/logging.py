@@ -1,50 +1,61 @@
-from loguru import logger
-import inspect
+import sys
 from functools import wraps
 
+from loguru import logger
+
+from app.core.config import settings
+
+_FORMAT = "{time} {level} {file.path} - {level} - {message}"
+
 
 class CustomLogger:
+    """Обёртка над loguru.
+
+    Файл вызывающего кода определяет сам loguru через opt(depth=...) (это один
+    sys._getframe, без inspect.stack()). Сообщение можно передавать шаблоном
+    с аргументами — main_logger.debug("канал {} : {} сообщений", ch.id, n) — тогда
+    форматирование выполняется, только если уровень включён, а вызовы ниже
+    минимального уровня всех обработчиков отбрасываются сразу.
+    LOG_ENQUEUE переносит запись в файлы в фоновый поток.
+    """
+
     def __init__(self):
+        enqueue = bool(getattr(settings, "LOG_ENQUEUE", False))
+        file_level = str(getattr(settings, "LOG_LEVEL", "DEBUG")).upper()
+        stdout_level = max(file_level, "INFO", key=lambda name: logger.level(name).no)
+
+        # Стандартный обработчик loguru (stderr) дублировал бы вывод в stdout
+        logger.remove()
         # Настраиваем логгер для записи в файлы
-        logger.add("logs/logfile.log", format="{time} {level} {message}", level="DEBUG")
-        logger.add("logs/errorfile.log", format="{time} {level} {message}", level="ERROR")
-        
+        logger.add("logs/logfile.log", format=_FORMAT, level=file_level, enqueue=enqueue)
+        logger.add("logs/errorfile.log", format=_FORMAT, level="ERROR", enqueue=enqueue)
+
         # Добавляем вывод в стандартный поток (stdout) для Docker
-        logger.add("sys.stdout", format="{time} {level} {message}", level="INFO")
-
-    def _get_caller_info(self):
-        frame = inspect.stack()[2]
-        module = inspect.getmodule(frame[0])
-        filename = module.__file__ if module else "unknown"
-        return filename
-
-    def info(self, message):
-        filename = self._get_caller_info()
-        logger.info(f"{filename} - INFO - {message}")
-
-    def debug(self, message):
-        filename = self._get_caller_info()
-        logger.debug(f"{filename} - DEBUG - {message}")
-
-    def error(self, message, exc_info=False):
-        filename = self._get_caller_info()
-        if exc_info:
-            # Для ошибок с трассировкой
-            logger.opt(exception=True).error(f"{filename} - ERROR - {message}")
-        else:
-            logger.error(f"{filename} - ERROR - {message}")
-
-    def warning(self, message):
-        filename = self._get_caller_info()
-        logger.warning(f"{filename} - WARNING - {message}")
-
-    def critical(self, message, exc_info=False):
-        filename = self._get_caller_info()
-        if exc_info:
-            # Для критических ошибок с трассировкой
-            logger.opt(exception=True).critical(f"{filename} - CRITICAL - {message}")
-        else:
-            logger.critical(f"{filename} - CRITICAL - {message}")
+        logger.add(sys.stdout, format=_FORMAT, level=stdout_level, enqueue=enqueue)
+
+        self._min_level = min(logger.level(name).no for name in (file_level, "ERROR", stdout_level))
+
+    def _log(self, level: str, message, args, kwargs, exc_info: bool = False) -> None:
+        if logger.level(level).no < self._min_level:
+            return
+        # depth=2: _log -> info/error/... -> вызывающий код
+        logger.opt(depth=2, exception=exc_info or None).log(level, message, *args, **kwargs)
+
+    def info(self, message, *args, **kwargs):
+        self._log("INFO", message, args, kwargs)
+
+    def debug(self, message, *args, **kwargs):
+        self._log("DEBUG", message, args, kwargs)
+
+    def error(self, message, *args, exc_info=False, **kwargs):
+        # exc_info=True — с трассировкой
+        self._log("ERROR", message, args, kwargs, exc_info)
+
+    def warning(self, message, *args, **kwargs):
+        self._log("WARNING", message, args, kwargs)
+
+    def critical(self, message, *args, exc_info=False, **kwargs):
+        self._log("CRITICAL", message, args, kwargs, exc_info)
 
     def log_exceptions(self, func):
         @wraps(func)
@@ -58,4 +69,4 @@ class CustomLogger:
         return wrapper
 
 
-main_logger = CustomLogger()
\ No newline at end of file
+main_logger = CustomLogger()
@@ -8,10 +8,12 @@ from alembic import context
 from app.db.database import Base
 from app.core.config import settings
 from bot.models.user_model import User, UserSettings  # noqa: F401
-from bot.models.channel import Channel, ChannelProposal  # noqa: F401
+from bot.models.channel import Channel, ChannelPeer, ChannelProposal  # noqa: F401
 from bot.models.keyword import Keyword, KeywordProposal  # noqa: F401
 from bot.models.post import Post, PostKeywordMatch, PostProcessing, Postponed  # noqa: F401
 from bot.models.telethon_account import TelethonAccount  # noqa: F401
+from bot.models.notification import NotificationOutbox  # noqa: F401
+from bot.models.report import ReportDirtyHour, ReportRollup  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
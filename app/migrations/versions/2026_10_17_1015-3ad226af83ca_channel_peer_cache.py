@@ -0,0 +1,49 @@
+"""channel peer cache
+
+Revision ID: 3ad226af83ca
+Revises: 3ef547f372b8
+Create Date: 2026-10-17 10:15:04.118302
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3ad226af83ca"
+down_revision: Union[str, None] = "3ef547f372b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_peer",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("channel_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("peer_id", sa.BigInteger(), nullable=False),
+        sa.Column("access_hash", sa.BigInteger(), nullable=False),
+        sa.Column("is_member", sa.Boolean(), nullable=False),
+        sa.Column(
+            "resolved_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["account_id"], ["telethon_account.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["channel_id"], ["channel.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "channel_id", "account_id", name="uq_channel_peer_channel_account"
+        ),
+    )
+    op.create_index(op.f("ix_channel_peer_id"), "channel_peer", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_channel_peer_id"), table_name="channel_peer")
+    op.drop_table("channel_peer")
@@ -0,0 +1,93 @@
+"""post unique indexes
+
+Revision ID: 9b1f4c2d7e65
+Revises: 3ad226af83ca
+Create Date: 2026-10-17 11:40:27.514920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1f4c2d7e65"
+down_revision: Union[str, None] = "3ad226af83ca"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дубликаты постов: переносим ссылки на самый ранний пост и удаляем остальные
+    for child in ("post_keyword_match", "post_processing", "postponed"):
+        op.execute(
+            sa.text(
+                f"""
+                WITH d AS (
+                    SELECT id, min(id) OVER (PARTITION BY channel_id, message_id) AS keep_id
+                    FROM post
+                )
+                UPDATE {child} t SET post_id = d.keep_id
+                FROM d
+                WHERE t.post_id = d.id AND d.id <> d.keep_id
+                """
+            )
+        )
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM post p USING post k
+            WHERE p.channel_id = k.channel_id AND p.message_id = k.message_id AND p.id > k.id
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM post_keyword_match a USING post_keyword_match b
+            WHERE a.post_id = b.post_id AND a.keyword_id = b.keyword_id AND a.id > b.id
+            """
+        )
+    )
+    # Из дублей обработки оставляем уже обработанную запись, иначе самую раннюю
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM post_processing
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY post_id, operator_id
+                        ORDER BY (status = 'pending'), id
+                    ) AS rn
+                    FROM post_processing
+                ) r
+                WHERE r.rn > 1
+            )
+            """
+        )
+    )
+
+    op.create_index(
+        "uq_post_channel_message", "post", ["channel_id", "message_id"], unique=True
+    )
+    op.create_index(
+        "uq_post_keyword_match_post_keyword",
+        "post_keyword_match",
+        ["post_id", "keyword_id"],
+        unique=True,
+    )
+    op.create_index(
+        "uq_post_processing_post_operator",
+        "post_processing",
+        ["post_id", "operator_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_post_processing_post_operator", table_name="post_processing")
+    op.drop_index("uq_post_keyword_match_post_keyword", table_name="post_keyword_match")
+    op.drop_index("uq_post_channel_message", table_name="post")
@@ -0,0 +1,33 @@
+"""pending notify index
+
+Revision ID: 5e0a7d3c91b8
+Revises: 9b1f4c2d7e65
+Create Date: 2026-10-17 12:25:41.307615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0a7d3c91b8"
+down_revision: Union[str, None] = "9b1f4c2d7e65"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_post_processing_pending_notify",
+        "post_processing",
+        ["post_id"],
+        unique=False,
+        postgresql_where=sa.text("notify_sent_at IS NULL AND status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_processing_pending_notify", table_name="post_processing")
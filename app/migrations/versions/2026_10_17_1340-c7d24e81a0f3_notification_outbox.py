@@ -0,0 +1,84 @@
+"""notification outbox
+
+Revision ID: c7d24e81a0f3
+Revises: 5e0a7d3c91b8
+Create Date: 2026-10-17 13:40:12.846021
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d24e81a0f3"
+down_revision: Union[str, None] = "5e0a7d3c91b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("pp_id", sa.Integer(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "next_retry_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["pp_id"], ["post_processing.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("pp_id"),
+    )
+    op.create_index(
+        op.f("ix_notification_outbox_id"), "notification_outbox", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_notification_outbox_due",
+        "notification_outbox",
+        ["next_retry_at"],
+        unique=False,
+        postgresql_where=sa.text("state IN ('pending', 'sending')"),
+    )
+
+    # Ещё не отправленные уведомления переносим в очередь
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO notification_outbox (pp_id, state, attempts)
+            SELECT id, 'pending', 0
+            FROM post_processing
+            WHERE status = 'pending' AND notify_sent_at IS NULL AND processed_at IS NULL
+            """
+        )
+    )
+    # Выборку неотправленных теперь ведёт очередь
+    op.drop_index("ix_post_processing_pending_notify", table_name="post_processing")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_post_processing_pending_notify",
+        "post_processing",
+        ["post_id"],
+        unique=False,
+        postgresql_where=sa.text("notify_sent_at IS NULL AND status = 'pending'"),
+    )
+    op.drop_index("ix_notification_outbox_due", table_name="notification_outbox")
+    op.drop_index(op.f("ix_notification_outbox_id"), table_name="notification_outbox")
+    op.drop_table("notification_outbox")
@@ -0,0 +1,27 @@
+"""channel pts
+
+Revision ID: 4f8e2b6a1d39
+Revises: c7d24e81a0f3
+Create Date: 2026-10-17 15:05:53.640218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8e2b6a1d39"
+down_revision: Union[str, None] = "c7d24e81a0f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("channel", sa.Column("pts", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("channel", "pts")
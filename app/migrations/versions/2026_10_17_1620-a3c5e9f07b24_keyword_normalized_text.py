@@ -0,0 +1,74 @@
+"""keyword normalized text
+
+Revision ID: a3c5e9f07b24
+Revises: 4f8e2b6a1d39
+Create Date: 2026-10-17 16:20:09.771348
+
+"""
+
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c5e9f07b24"
+down_revision: Union[str, None] = "4f8e2b6a1d39"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия bot.utils.text_normalize на момент этой ревизии: миграция не должна
+# зависеть от кода приложения, который может измениться позже
+_INVISIBLE_RE = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+_DASH_RE = re.compile("[\\-\u2010\u2011\u2012\u2013\u2014\u2015\u2212\u2e3a\u2e3b]+")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+_CYRILLIC_RE = re.compile("[\u0400-\u04ff]")
+_HOMOGLYPHS = str.maketrans("aceopxykmthb", "асеорхукмтнв")
+
+
+def _fix_homoglyphs(match: re.Match) -> str:
+    word = match.group(0)
+    if word.isascii() or not _CYRILLIC_RE.search(word):
+        return word
+    return word.translate(_HOMOGLYPHS)
+
+
+def _normalize_light(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    return _INVISIBLE_RE.sub("", text).casefold().replace("ё", "е")
+
+
+def _normalize_keyword(text: str, kw_type: str | None) -> str:
+    text = _normalize_light(text or "")
+    if (kw_type or "word") == "regex" or not text:
+        return text
+    text = _WORD_RE.sub(_fix_homoglyphs, text)
+    text = _DASH_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def upgrade() -> None:
+    op.add_column("keyword", sa.Column("normalized_text", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_keyword_normalized_text"), "keyword", ["normalized_text"], unique=False
+    )
+
+    # Заполняем нормализованную форму существующих ключевых слов
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, text, type FROM keyword")).fetchall()
+    for kw_id, text, kw_type in rows:
+        conn.execute(
+            sa.text("UPDATE keyword SET normalized_text = :norm WHERE id = :id"),
+            {"norm": _normalize_keyword(text, kw_type), "id": kw_id},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_keyword_normalized_text"), table_name="keyword")
+    op.drop_column("keyword", "normalized_text")
@@ -0,0 +1,89 @@
+"""report and fk indexes
+
+Revision ID: d81b3f5c6a27
+Revises: a3c5e9f07b24
+Create Date: 2026-10-17 17:10:36.205184
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d81b3f5c6a27"
+down_revision: Union[str, None] = "a3c5e9f07b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Окна отчётов и уведомлений по дате публикации
+    op.create_index(op.f("ix_post_published_at"), "post", ["published_at"], unique=False)
+    op.create_index(
+        "ix_post_processing_operator_status",
+        "post_processing",
+        ["operator_id", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_post_processing_pending",
+        "post_processing",
+        ["post_id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    # Внешние ключи, не покрытые ведущим столбцом других индексов
+    op.create_index(
+        op.f("ix_post_keyword_match_keyword_id"),
+        "post_keyword_match",
+        ["keyword_id"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_postponed_post_id"), "postponed", ["post_id"], unique=False)
+    op.create_index(
+        op.f("ix_postponed_operator_id"), "postponed", ["operator_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_keyword_proposal_keyword_id"),
+        "keyword_proposal",
+        ["keyword_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_keyword_proposal_operator_id"),
+        "keyword_proposal",
+        ["operator_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_channel_proposal_operator_id"),
+        "channel_proposal",
+        ["operator_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_channel_proposal_channel_id"),
+        "channel_proposal",
+        ["channel_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_channel_peer_account_id"), "channel_peer", ["account_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_channel_peer_account_id"), table_name="channel_peer")
+    op.drop_index(op.f("ix_channel_proposal_channel_id"), table_name="channel_proposal")
+    op.drop_index(op.f("ix_channel_proposal_operator_id"), table_name="channel_proposal")
+    op.drop_index(op.f("ix_keyword_proposal_operator_id"), table_name="keyword_proposal")
+    op.drop_index(op.f("ix_keyword_proposal_keyword_id"), table_name="keyword_proposal")
+    op.drop_index(op.f("ix_postponed_operator_id"), table_name="postponed")
+    op.drop_index(op.f("ix_postponed_post_id"), table_name="postponed")
+    op.drop_index(op.f("ix_post_keyword_match_keyword_id"), table_name="post_keyword_match")
+    op.drop_index("ix_post_processing_pending", table_name="post_processing")
+    op.drop_index("ix_post_processing_operator_status", table_name="post_processing")
+    op.drop_index(op.f("ix_post_published_at"), table_name="post")
@@ -0,0 +1,45 @@
+"""report rollup
+
+Revision ID: 6b2d9e4a8c13
+Revises: d81b3f5c6a27
+Create Date: 2026-10-17 17:55:48.390417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b2d9e4a8c13"
+down_revision: Union[str, None] = "d81b3f5c6a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_rollup",
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("dimension", sa.String(), nullable=False),
+        sa.Column("dim_id", sa.Integer(), nullable=False),
+        sa.Column("matched_posts", sa.Integer(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("postponed", sa.Integer(), nullable=False),
+        sa.Column("pending", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("bucket", "dimension", "dim_id"),
+    )
+    # Компактор ищет записи обработки со сменившимся статусом
+    op.create_index(
+        op.f("ix_post_processing_processed_at"),
+        "post_processing",
+        ["processed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_post_processing_processed_at"), table_name="post_processing")
+    op.drop_table("report_rollup")
@@ -0,0 +1,45 @@
+"""report dirty hour
+
+Revision ID: e5a1c7b39d02
+Revises: 6b2d9e4a8c13
+Create Date: 2026-10-17 18:40:17.526093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c7b39d02"
+down_revision: Union[str, None] = "6b2d9e4a8c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_dirty_hour",
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("bucket"),
+    )
+    # Разовое заполнение report_rollup: компактор пересчитает все часы с постами пачками
+    op.execute(
+        "INSERT INTO report_dirty_hour (bucket) "
+        "SELECT DISTINCT date_trunc('hour', published_at) FROM post "
+        "ON CONFLICT DO NOTHING"
+    )
+    # Грязные часы больше не ищутся по processed_at
+    op.drop_index(op.f("ix_post_processing_processed_at"), table_name="post_processing")
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("ix_post_processing_processed_at"),
+        "post_processing",
+        ["processed_at"],
+        unique=False,
+    )
+    op.drop_table("report_dirty_hour")
@@ -0,0 +1,11 @@
+"""Запуск бота: `python -m bot`.
+
+Главный модуль — bot.__main__, поэтому процессы пула сопоставления (spawn)
+не импортируют bot.bot заново и не создают Bot, Dispatcher и обработчики логов.
+"""
+import asyncio
+
+from bot.bot import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,6 +13,7 @@ from bot.schemas.keyword_schema import KeyWordCreateSchema
 from bot.service.user_service import UserService
 from bot.utils.depend import get_atomic_db
 from bot.models.keyword import KeywordType
+from bot.utils.text_normalize import normalize_keyword
 
 router = Router()
 
@@ -253,21 +254,23 @@ async def handle_bulk_keywords_file(message: Message, state: FSMContext):
         await message.answer("Не удалось прочитать файл.")
         return
 
-    # Загружаем существующие в lower для де-дупликации
-    existing_lower = set()
+    # Загружаем нормализованные формы существующих слов для де-дупликации:
+    # варианты с другими тире, пробелами, ё/е или регистром не добавляются повторно
+    existing_norm = set()
     async with get_atomic_db() as db:
         all_kw = await db.keywords.get_all_keywords()
-        existing_lower = { (k.text or "").strip().lower() for k in all_kw }
+        existing_norm = {k.normalized_text or normalize_keyword(k.text or "", k.type) for k in all_kw}
 
     to_create: List[KeyWordCreateSchema] = []
     for line in lines:
         norm = line.strip()
         if not norm:
             continue
-        if norm.lower() in existing_lower:
+        key = normalize_keyword(norm, KeywordType.WORD.value)
+        if not key or key in existing_norm:
             continue
         to_create.append(KeyWordCreateSchema(text=cast(str, norm), type=KeywordType.WORD, is_active=True))
-        existing_lower.add(norm.lower())
+        existing_norm.add(key)
 
     created = 0
     async with get_atomic_db() as db:
@@ -1,15 +1,16 @@
+import asyncio
+
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, BufferedInputFile, InlineKeyboardMarkup, InlineKeyboardButton
-from io import BytesIO
-from docx import Document as DocxDocument
 from app.core.logging import main_logger
 from bot.keyboards.keyboards import get_operator_access_request_keyboard, get_main_keyboard
 from bot.service.user_service import UserService
+from bot.tasks.report_cache import report_file_cache
+from bot.tasks.report_rollup import report_compactor
 from bot.utils.depend import get_atomic_db
-from bot.models.post import PostStatus
 from bot.models.user_model import Language, TimeZone
-from bot.utils.time_utils import format_dt, get_dt_format
-from bot.utils.i18n import t, t_plain, strip_html
+from bot.utils.i18n import t
+from bot.utils.report_docx import DocxDocument, ReportDocxWriter
 
 
 
@@ -219,26 +220,25 @@ async def show_report(message: Message):
             st = await db.user.get_or_create_settings(user.id) if user else None
             lang = st.language if st else Language.RU.value
             tz = st.time_zone if st else TimeZone.GMT.value
-            fmt = get_dt_format(lang)
 
-            total_channels = await db.channel.count_channels()
-            total_keywords = len(await db.keywords.get_all_keywords())
-            total_matched_posts = await db.post.count_distinct_posts_with_matches(within_hours)
-            processed = await db.post.count_processing_by_status(PostStatus.PROCESSED.value, within_hours)
-            postponed = await db.post.count_processing_by_status(PostStatus.POSTPONED.value, within_hours)
-            pending = await db.post.count_processing_by_status(PostStatus.PENDING.value, within_hours)
+            # Все счётчики и статистика операторов — два запроса; полные часы окна
+            # берутся из почасовых счётчиков, остаток — из сырых таблиц
+            rolled_until = report_compactor.rolled_until if report_compactor.enabled else None
+            stats = await db.report.get_report_stats(within_hours, rolled_until)
+            total_channels, total_keywords = stats.total_channels, stats.total_keywords
+            total_matched_posts = stats.matched_posts
+            processed, postponed, pending = stats.processed, stats.postponed, stats.pending
 
             # Статистика по операторам (оставим формат строк как есть)
-            op_stats_raw = await db.post.get_operator_stats(within_hours)
             op_lines = []
-            for op_id, proc_cnt, postp_cnt in op_stats_raw:
-                u = await db.user.get_user_by_filter(id=op_id)
-                if u and getattr(u, "username", None):
-                    display = f"@{u.username}"
-                elif u:
-                    name_parts = [p for p in [getattr(u, 'first_name', None), getattr(u, 'last_name', None)] if p]
-                    visible = " ".join(name_parts) if name_parts else str(u.telegram_id)
-                    display = f"<a href=\"tg://user?id={u.telegram_id}\">{visible}</a>"
+            for op in stats.operators:
+                proc_cnt, postp_cnt = op.processed, op.postponed
+                if op.username:
+                    display = f"@{op.username}"
+                elif op.telegram_id is not None:
+                    name_parts = [p for p in [op.first_name, op.last_name] if p]
+                    visible = " ".join(name_parts) if name_parts else str(op.telegram_id)
+                    display = f"<a href=\"tg://user?id={op.telegram_id}\">{visible}</a>"
                 else:
                     display = "—"
                 # пока без локализации подписи
@@ -261,53 +261,27 @@ async def show_report(message: Message):
             await message.answer("⚠️ Подробный .docx отчёт недоступен (python-docx не установлен).")
             return
 
-        try:
+        counters = {
+            'total_channels': total_channels,
+            'total_keywords': total_keywords,
+            'found_posts': total_matched_posts,
+            'processed': processed,
+            'postponed': postponed,
+            'pending': pending,
+        }
+
+        async def build_docx() -> bytes:
+            # python-docx синхронный — собираем документ в потоке, посты читаем из БД пачками
+            writer = await asyncio.to_thread(ReportDocxWriter, lang, tz, within_hours, counters, op_lines)
             async with get_atomic_db() as db:
-                posts = await db.post.get_recent_matched_posts(within_hours)
-
-            doc = DocxDocument()
-            doc.add_heading(t_plain(lang, 'report_title', hours=within_hours), level=0)
-            doc.add_paragraph("")
-            doc.add_paragraph(t_plain(lang, 'total_channels', n=total_channels))
-            doc.add_paragraph(t_plain(lang, 'total_keywords', n=total_keywords))
-            doc.add_paragraph(t_plain(lang, 'found_posts', n=total_matched_posts))
-            doc.add_paragraph(t_plain(lang, 'processed', n=processed))
-            doc.add_paragraph(t_plain(lang, 'postponed', n=postponed))
-            doc.add_paragraph(t_plain(lang, 'pending', n=pending))
-
-            doc.add_heading("Операторы", level=1)
-            if op_lines:
-                for line in op_lines:
-                    doc.add_paragraph(strip_html(line), style="List Bullet")
-            else:
-                doc.add_paragraph("—")
-
-            doc.add_heading("Посты", level=1)
-            for p in posts:
-                ch_title = p.channel.title if p.channel.title else p.channel.channel_username
-                doc.add_heading(ch_title, level=2)
-                doc.add_paragraph(t_plain(lang, 'notify_date', dt=format_dt(getattr(p, 'published_at', None), tz, fmt)))
-                if getattr(p, "url", None):
-                    doc.add_paragraph(f"URL: {p.url}")
-                kw_texts = []
-                try:
-                    for mk in getattr(p, "matched_keywords", []) or []:
-                        if getattr(mk, "keyword", None) and mk.keyword.text:
-                            if mk.keyword.text not in kw_texts:
-                                kw_texts.append(mk.keyword.text)
-                except Exception:
-                    pass
-                if kw_texts:
-                    doc.add_paragraph("Keywords: " + ", ".join(kw_texts))
-                preview = (p.text or "").strip()
-                doc.add_paragraph(strip_html(preview) if preview else "(no text)")
-                doc.add_paragraph("")
-
-            bio = BytesIO()
-            doc.save(bio)
-            bio.seek(0)
+                async for rows in db.post.stream_report_posts(within_hours):
+                    await asyncio.to_thread(writer.add_posts, rows)
+            return await asyncio.to_thread(writer.save)
+
+        try:
+            data = await report_file_cache.get_or_build((within_hours, lang, tz), build_docx)
             fname = f"report_{within_hours}h.docx"
-            file = BufferedInputFile(bio.read(), filename=fname)
+            file = BufferedInputFile(data, filename=fname)
             await message.answer_document(file, caption=t(lang, 'detailed_report_caption'))
         except Exception as e:
             main_logger.error(f"show_report docx error: {e}")
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, BigInteger, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, BigInteger, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -40,6 +40,9 @@ class Channel(Base):
     
     # ID последнего обработанного сообщения из канала
     last_parsed_message_id = Column(BigInteger, nullable=True)
+
+    # pts канала в Telegram, от которого догоняем через updates.getChannelDifference
+    pts = Column(Integer, nullable=True)
     
     # Время последней проверки канала
     last_checked = Column(DateTime(timezone=True), nullable=True)
@@ -48,6 +51,23 @@ class Channel(Base):
     posts = relationship("Post", back_populates="channel")
 
 
+class ChannelPeer(Base):
+    """
+    Разрешённая сущность канала для конкретного Telethon-аккаунта.
+    access_hash выдаётся Telegram каждому аккаунту свой, поэтому кэш хранится по паре (канал, аккаунт).
+    """
+    __tablename__ = "channel_peer"
+    __table_args__ = (UniqueConstraint("channel_id", "account_id", name="uq_channel_peer_channel_account"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    channel_id = Column(Integer, ForeignKey("channel.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("telethon_account.id", ondelete="CASCADE"), nullable=False, index=True)
+    peer_id = Column(BigInteger, nullable=False)  # id канала в Telegram (без префикса -100)
+    access_hash = Column(BigInteger, nullable=False)
+    is_member = Column(Boolean, default=False, nullable=False)  # Аккаунт состоит в канале (приходят обновления)
+    resolved_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class ChannelProposal(Base):
     """
     Модель предложения добавления нового канала от оператора.
@@ -57,9 +77,9 @@ class ChannelProposal(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     channel_username = Column(String, nullable=True)  # @username канала (если есть)
-    operator_id = Column(BigInteger, ForeignKey("user.telegram_id"), nullable=False)
+    operator_id = Column(BigInteger, ForeignKey("user.telegram_id"), nullable=False, index=True)
     status = Column(String, default=ProposalStatus.PENDING.value, nullable=False)  # pending, approved, rejected
-    channel_id = Column(Integer, ForeignKey("channel.id"), nullable=True)  # ID созданного канала (если одобрено)
+    channel_id = Column(Integer, ForeignKey("channel.id"), nullable=True, index=True)  # ID созданного канала (если одобрено)
     comment = Column(Text, nullable=True)  # Комментарий оператора
     admin_comment = Column(Text, nullable=True)  # Комментарий администратора
     
@@ -1,21 +1,15 @@
-from enum import Enum
 from typing import List, Optional
 
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
+# Перечисление живёт вне моделей, чтобы его могли импортировать воркеры сопоставления без БД
+from bot.utils.keyword_types import KeywordType  # noqa: F401
 # Импортируем клас��, чтобы он был зарегистрирован в реестре до конфигурации отношений
 from .post import PostKeywordMatch  # noqa: F401
 
 
-class KeywordType(str, Enum):
-    """Типы ключевых слов"""
-    WORD = "word"  # Отдельное слово
-    PHRASE = "phrase"  # Фраза (несколько слов)
-    REGEX = "regex"  # Регулярное выражение
-
-
 class Keyword(Base):
     """
     Модель ключевого слова или фразы для мониторинга.
@@ -24,6 +18,9 @@ class Keyword(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     text = Column(String, nullable=False, index=True)
+    # Форма для сопоставления (bot.utils.text_normalize.normalize_keyword): варианты написания
+    # с разными тире, пробелами, ё/е и регистром совпадают
+    normalized_text = Column(String, nullable=True, index=True)
     type = Column(String, default=KeywordType.WORD.value, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     description = Column(Text, nullable=True)
@@ -40,8 +37,8 @@ class KeywordProposal(Base):
     __tablename__ = "keyword_proposal"
     
     id = Column(Integer, primary_key=True, index=True)
-    keyword_id = Column(Integer, ForeignKey("keyword.id"), nullable=True)
-    operator_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    keyword_id = Column(Integer, ForeignKey("keyword.id"), nullable=True, index=True)
+    operator_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
     text = Column(String, nullable=False)
     type = Column(String, default=KeywordType.WORD.value, nullable=False)
     status = Column(String, default="pending", nullable=False)  # pending, approved, rejected
@@ -0,0 +1,37 @@
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text as sa_text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class OutboxState(str, Enum):
+    """Состояния записи очереди уведомлений"""
+    PENDING = "pending"  # Ожидает отправки (в том числе повторной)
+    SENDING = "sending"  # Захвачена отправителем до locked_until
+    SENT = "sent"  # Отправлена
+    SKIPPED = "skipped"  # Пост уже обработан или вышел из окна актуальности
+    FAILED = "failed"  # Исчерпаны попытки отправки
+
+
+class NotificationOutbox(Base):
+    """
+    Очередь уведомлений операторам: одна запись на PostProcessing.
+    Отправители забирают записи через SELECT ... FOR UPDATE SKIP LOCKED с арендой
+    до locked_until, поэтому несколько реплик бота делят работу без повторов.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "next_retry_at", postgresql_where=sa_text("state IN ('pending', 'sending')")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    pp_id = Column(Integer, ForeignKey("post_processing.id", ondelete="CASCADE"), nullable=False, unique=True)
+    state = Column(String, default=OutboxState.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_retry_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
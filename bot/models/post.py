@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, BigInteger
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, BigInteger, Index, text as sa_text
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -21,6 +21,7 @@ class Post(Base):
     Модель поста из Telegram-канала.
     """
     __tablename__ = "post"
+    __table_args__ = (Index("uq_post_channel_message", "channel_id", "message_id", unique=True),)
     
     id = Column(Integer, primary_key=True, index=True)
     channel_id = Column(Integer, ForeignKey("channel.id"), nullable=False)
@@ -29,7 +30,7 @@ class Post(Base):
     html_text = Column(Text, nullable=True)  # HTML-форматированный текст поста
     media_type = Column(String, nullable=True)  # Тип медиа (photo, video, document, etc.)
     media_file_id = Column(String, nullable=True)  # ID медиа-файла в Telegram
-    published_at = Column(DateTime(timezone=True), nullable=False)  # Дата публикации в канале
+    published_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Дата публикации в канале
     url = Column(String, nullable=True)  # URL поста в канале
     
     # Отношения
@@ -43,10 +44,11 @@ class PostKeywordMatch(Base):
     Модель для связи постов с ключевыми словами, которые были найдены в посте.
     """
     __tablename__ = "post_keyword_match"
+    __table_args__ = (Index("uq_post_keyword_match_post_keyword", "post_id", "keyword_id", unique=True),)
     
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
-    keyword_id = Column(Integer, ForeignKey("keyword.id"), nullable=False)
+    keyword_id = Column(Integer, ForeignKey("keyword.id"), nullable=False, index=True)
     
     # Отношения
     post = relationship("Post", back_populates="matched_keywords")
@@ -58,6 +60,13 @@ class PostProcessing(Base):
     Модель для хранения информации об обработке поста оператором.
     """
     __tablename__ = "post_processing"
+    __table_args__ = (
+        Index("uq_post_processing_post_operator", "post_id", "operator_id", unique=True),
+        # Отчёты по операторам и статусам; покрывает и внешний ключ operator_id
+        Index("ix_post_processing_operator_status", "operator_id", "status"),
+        # Ожидающие обработки записи (уведомления, отчёты по PENDING)
+        Index("ix_post_processing_pending", "post_id", postgresql_where=sa_text("status = 'pending'")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
@@ -83,8 +92,8 @@ class Postponed(Base):
     __tablename__ = "postponed"
 
     id = Column(Integer, primary_key=True, index=True)
-    post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
-    operator_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("post.id"), nullable=False, index=True)
+    operator_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
     at_postpone = Column(DateTime(timezone=True), nullable=False)  # Время отложения
     reason = Column(Text, nullable=True)  # Причина отложения
 
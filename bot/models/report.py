@@ -0,0 +1,41 @@
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.db.database import Base
+
+
+class RollupDimension(str, Enum):
+    """Срезы почасовой статистики отчётов"""
+    TOTAL = "total"  # Итоги по всем каналам (dim_id = 0)
+    CHANNEL = "channel"  # По каналу (dim_id = channel.id)
+    KEYWORD = "keyword"  # По ключевому слову (dim_id = keyword.id)
+    OPERATOR = "operator"  # По оператору (dim_id = user.id), matched_posts — назначенные посты
+
+
+class ReportRollup(Base):
+    """
+    Почасовые счётчики для отчётов: одна строка на (час публикации, срез, id).
+    Строки пересчитывает фоновый компактор, отчёт за окно — сумма по нескольким
+    сотням строк вместо сканирования post/post_processing.
+    """
+    __tablename__ = "report_rollup"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Начало часа (по published_at)
+    dimension = Column(String, primary_key=True)
+    dim_id = Column(Integer, primary_key=True, default=0)
+    matched_posts = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    postponed = Column(Integer, default=0, nullable=False)
+    pending = Column(Integer, default=0, nullable=False)
+
+
+class ReportDirtyHour(Base):
+    """
+    Часы, счётчики которых нужно пересчитать. Строку ставит та же транзакция,
+    что пишет посты или меняет статус обработки, поэтому компактор не пропускает
+    изменения, зафиксированные позже, чем он начал проход.
+    """
+    __tablename__ = "report_dirty_hour"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
@@ -1,7 +1,8 @@
-from sqlalchemy import insert, select, update
+from sqlalchemy import insert, select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql import func
 
-from bot.models.channel import ChannelProposal, Channel
+from bot.models.channel import ChannelProposal, Channel, ChannelPeer
 from bot.repo.base_repo import BaseRepository
 from bot.schemas.channel import AddChannelProposal, AddChannel
 
@@ -69,8 +70,16 @@ class ChannelRepository(BaseRepository):
             .where(Channel.id == channel_id)
             .values(last_parsed_message_id=message_id)
         )
+        # Фиксируется транзакцией стадии сохранения вместе с постами
+        await self.session.execute(stmt)
+
+    async def update_pts(self, channel_id: int, pts: int):
+        stmt = (
+            update(Channel)
+            .where(Channel.id == channel_id)
+            .values(pts=pts)
+        )
         await self.session.execute(stmt)
-        await self.session.commit()
 
     async def touch_checked(self, channel_id: int):
         stmt = (
@@ -79,10 +88,35 @@ class ChannelRepository(BaseRepository):
             .values(last_checked=func.now())
         )
         await self.session.execute(stmt)
-        await self.session.commit()
 
     async def count_channels(self) -> int:
         """Общее количество каналов в системе."""
         stmt = select(func.count()).select_from(Channel)
         obj = await self.session.execute(stmt)
         return int(obj.scalar() or 0)
+
+    # -------- Кэш разрешённых сущностей каналов --------
+    async def list_channel_peers(self) -> list[ChannelPeer]:
+        stmt = select(ChannelPeer)
+        obj = await self.session.execute(stmt)
+        return obj.scalars().all()
+
+    async def upsert_channel_peer(self, channel_id: int, account_id: int, peer_id: int, access_hash: int, is_member: bool) -> ChannelPeer:
+        values = {"peer_id": peer_id, "access_hash": access_hash, "is_member": is_member}
+        stmt = (
+            pg_insert(ChannelPeer)
+            .values(channel_id=channel_id, account_id=account_id, **values)
+            .on_conflict_do_update(
+                index_elements=[ChannelPeer.channel_id, ChannelPeer.account_id],
+                set_={**values, "resolved_at": func.now()},
+            )
+            .returning(ChannelPeer)
+        )
+        obj = await self.session.execute(stmt)
+        await self.session.commit()
+        return obj.scalar()
+
+    async def delete_channel_peer(self, channel_id: int, account_id: int) -> None:
+        stmt = delete(ChannelPeer).where(ChannelPeer.channel_id == channel_id, ChannelPeer.account_id == account_id)
+        await self.session.execute(stmt)
+        await self.session.commit()
@@ -1,9 +1,11 @@
 from typing import List
 
-from sqlalchemy import select, insert, update
+from sqlalchemy import select, insert, update, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from bot.models.keyword import Keyword, KeywordProposal
 from bot.repo.base_repo import BaseRepository
+from bot.utils.text_normalize import normalize_keyword
 from bot.schemas.keyword_schema import (
     KeyWordSchema,
     KeyWordCreateSchema,
@@ -24,10 +26,23 @@ class KeyWordRepo(BaseRepository):
         result = await self.session.execute(obj)
         return result.scalar_one_or_none()
 
+    async def get_keyword_by_normalized(self, normalized_text: str) -> KeyWordSchema | None:
+        """Самое раннее ключевое слово с данной нормализованной формой. Форма не уникальна:
+        варианты написания, добавленные до её появления, в таблице не объединялись."""
+        obj = (
+            select(self.model)
+            .where(self.model.normalized_text == normalized_text)
+            .order_by(self.model.id)
+            .limit(1)
+        )
+        result = await self.session.execute(obj)
+        return result.scalars().first()
+
     async def create_keyword(self, data: KeyWordCreateSchema | dict) -> KeyWordSchema:
         payload = data.model_dump() if hasattr(data, "model_dump") else dict(data)
         if isinstance(payload.get("type"), object) and hasattr(payload["type"], "value"):
             payload["type"] = payload["type"].value
+        payload["normalized_text"] = normalize_keyword(payload.get("text") or "", payload.get("type"))
         stmt = insert(self.model).values(**payload).returning(self.model)
         result = await self.session.execute(stmt)
         await self.session.commit()
@@ -38,6 +53,12 @@ class KeyWordRepo(BaseRepository):
         payload = {k: v for k, v in payload.items() if v is not None}
         if isinstance(payload.get("type"), object) and hasattr(payload["type"], "value"):
             payload["type"] = payload["type"].value
+        if "text" in payload or "type" in payload:
+            current = await self.get_keyword_by_filter(id=keyword_id)
+            if current:
+                payload["normalized_text"] = normalize_keyword(
+                    payload.get("text", current.text), payload.get("type", current.type)
+                )
         update_stmt = (
             update(self.model)
             .where(self.model.id == keyword_id)
@@ -54,6 +75,22 @@ class KeyWordRepo(BaseRepository):
         result = await self.session.execute(stmt)
         return result.unique().scalars().all()
 
+    async def get_keywords_version(self) -> str:
+        """Отпечаток таблицы ключевых слов: count, max(id) и md5 от всех значимых полей.
+
+        Меняется при любом добавлении, изменении или удалении ключевого слова,
+        в том числе сделанном в обход бота.
+        """
+        row_repr = func.concat_ws(":", self.model.id, self.model.type, self.model.is_active, self.model.text)
+        stmt = select(
+            func.count(self.model.id),
+            func.max(self.model.id),
+            func.md5(func.string_agg(row_repr, aggregate_order_by(literal_column("'|'"), self.model.id))),
+        )
+        result = await self.session.execute(stmt)
+        count, max_id, digest = result.one()
+        return f"{count}:{max_id or 0}:{digest or ''}"
+
     # --------------------- KeywordProposal ---------------------
     async def create_keyword_proposal(self, data: KeyWordProposalCreateSchema | dict) -> KeyWordProposalSchema:
         payload = data.model_dump() if hasattr(data, "model_dump") else dict(data)
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from typing import Iterable, List
+
+from sqlalchemy import select, update, and_, or_, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from bot.models.notification import NotificationOutbox, OutboxState
+from bot.models.post import PostProcessing
+from bot.repo.base_repo import BaseRepository
+
+
+# Канал LISTEN/NOTIFY, которым стадия сохранения будит рассыльщика
+OUTBOX_CHANNEL = "notification_outbox"
+
+
+class NotificationRepository(BaseRepository):
+    """Очередь уведомлений. Методы не делают commit — фиксирует транзакция get_atomic_db."""
+    model = NotificationOutbox
+
+    async def enqueue(self, pp_ids: Iterable[int]) -> None:
+        """Ставит уведомления в очередь и шлёт NOTIFY в канал OUTBOX_CHANNEL."""
+        rows = [{"pp_id": pp_id, "state": OutboxState.PENDING.value} for pp_id in pp_ids]
+        if not rows:
+            return
+        stmt = pg_insert(NotificationOutbox).values(rows).on_conflict_do_nothing(
+            index_elements=[NotificationOutbox.pp_id]
+        )
+        await self.session.execute(stmt)
+        # Сигнал доставляется слушателям только после commit транзакции
+        await self.session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": OUTBOX_CHANNEL})
+
+    async def claim(self, limit: int, lease_sec: int, per_chat_limit: int) -> List:
+        """Забирает до `limit` готовых к отправке записей и арендует их на `lease_sec` секунд.
+
+        Одному получателю достаётся не больше `per_chat_limit` записей с учётом уже
+        отправляемых: иначе пачка из одного чата не успевает уйти за время аренды
+        при лимите Bot API в одно сообщение в секунду на чат.
+        Просроченная аренда (отправитель упал) делает запись снова доступной.
+        Строки: id, pp_id, attempts (с учётом текущей попытки).
+        """
+        now = func.now()
+        is_due = or_(
+            and_(
+                NotificationOutbox.state == OutboxState.PENDING.value,
+                NotificationOutbox.next_retry_at <= now,
+            ),
+            and_(
+                NotificationOutbox.state == OutboxState.SENDING.value,
+                NotificationOutbox.locked_until < now,
+            ),
+        )
+        in_flight = (
+            select(PostProcessing.operator_id, func.count().label("n"))
+            .select_from(NotificationOutbox)
+            .join(PostProcessing, PostProcessing.id == NotificationOutbox.pp_id)
+            .where(NotificationOutbox.state == OutboxState.SENDING.value, NotificationOutbox.locked_until >= now)
+            .group_by(PostProcessing.operator_id)
+            .subquery()
+        )
+        ranked = (
+            select(
+                NotificationOutbox.id,
+                (
+                    func.row_number().over(partition_by=PostProcessing.operator_id, order_by=NotificationOutbox.id)
+                    + func.coalesce(in_flight.c.n, 0)
+                ).label("slot"),
+            )
+            .select_from(NotificationOutbox)
+            .join(PostProcessing, PostProcessing.id == NotificationOutbox.pp_id)
+            .outerjoin(in_flight, in_flight.c.operator_id == PostProcessing.operator_id)
+            .where(is_due)
+            .subquery()
+        )
+        # FOR UPDATE несовместим с оконными функциями — блокируем во внешнем запросе
+        # и перепроверяем условие: запись могла забрать другая реплика
+        due = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.id.in_(select(ranked.c.id).where(ranked.c.slot <= per_chat_limit)), is_due)
+            .order_by(NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due))
+            .values(
+                state=OutboxState.SENDING.value,
+                locked_until=now + timedelta(seconds=lease_sec),
+                attempts=NotificationOutbox.attempts + 1,
+            )
+            .returning(NotificationOutbox.id, NotificationOutbox.pp_id, NotificationOutbox.attempts)
+        )
+        res = await self.session.execute(stmt)
+        return res.all()
+
+    async def extend_lease(self, outbox_ids: Iterable[int], lease_sec: int) -> None:
+        """Продлевает аренду ещё отправляемых записей на `lease_sec` секунд от текущего момента."""
+        outbox_ids = list(outbox_ids)
+        if not outbox_ids:
+            return
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(outbox_ids), NotificationOutbox.state == OutboxState.SENDING.value)
+            .values(locked_until=func.now() + timedelta(seconds=lease_sec))
+        )
+        await self.session.execute(stmt)
+
+    async def mark_sent(self, outbox_id: int) -> None:
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == outbox_id)
+            .values(state=OutboxState.SENT.value, sent_at=func.now(), locked_until=None, last_error=None)
+        )
+        await self.session.execute(stmt)
+
+    async def mark_skipped(self, outbox_ids: Iterable[int]) -> None:
+        outbox_ids = list(outbox_ids)
+        if not outbox_ids:
+            return
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(outbox_ids))
+            .values(state=OutboxState.SKIPPED.value, locked_until=None)
+        )
+        await self.session.execute(stmt)
+
+    async def mark_failed(self, outbox_id: int, error: str, retry_in_sec: float | None) -> None:
+        """Откладывает повтор на `retry_in_sec` секунд; None — попытки исчерпаны."""
+        values = {"locked_until": None, "last_error": error[:1000]}
+        if retry_in_sec is None:
+            values["state"] = OutboxState.FAILED.value
+        else:
+            values["state"] = OutboxState.PENDING.value
+            values["next_retry_at"] = func.now() + timedelta(seconds=retry_in_sec)
+        stmt = update(NotificationOutbox).where(NotificationOutbox.id == outbox_id).values(**values)
+        await self.session.execute(stmt)
@@ -1,70 +1,113 @@
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import insert, select, and_, update, func, distinct, case
+from sqlalchemy import select, and_, update, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.orm import selectinload
 
+from bot.models.channel import Channel
+from bot.models.keyword import Keyword
 from bot.models.post import Post, PostKeywordMatch, PostProcessing, PostStatus
+from bot.models.user_model import Language, TimeZone, User, UserSettings
 from bot.repo.base_repo import BaseRepository
+from bot.repo.report_repo import mark_report_hours_dirty
 
 
-class PostRepository(BaseRepository):
-    model = Post
+# Строк на один многострочный INSERT: держимся далеко от лимита параметров asyncpg (32767)
+BULK_CHUNK = 500
 
-    async def get_post_by_channel_message(self, channel_id: int, message_id: int) -> Optional[Post]:
-        stmt = select(Post).where(Post.channel_id == channel_id, Post.message_id == message_id)
-        res = await self.session.execute(stmt)
-        return res.scalar_one_or_none()
-
-    async def create_post(self, values: dict) -> Post:
-        stmt = insert(Post).values(**values).returning(Post)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
-        return res.scalar()
 
-    async def create_keyword_match(self, post_id: int, keyword_id: int) -> PostKeywordMatch:
-        stmt = insert(PostKeywordMatch).values(post_id=post_id, keyword_id=keyword_id).returning(PostKeywordMatch)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
-        return res.scalar()
+def _chunks(rows: list, size: int = BULK_CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
 
-    async def get_processing_for_post_operator(self, post_id: int, operator_id: int) -> Optional[PostProcessing]:
-        stmt = select(PostProcessing).where(
-            and_(PostProcessing.post_id == post_id, PostProcessing.operator_id == operator_id)
-        )
-        res = await self.session.execute(stmt)
-        return res.scalar_one_or_none()
 
-    async def create_processing(self, post_id: int, operator_id: int) -> PostProcessing:
-        payload = {
-            "post_id": post_id,
-            "operator_id": operator_id,
-            "status": PostStatus.PENDING.value,
-            "comment": None,
-            "processed_at": None,
-        }
-        stmt = insert(PostProcessing).values(**payload).returning(PostProcessing)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
-        return res.scalar()
+class PostRepository(BaseRepository):
+    model = Post
 
-    async def get_pending_processing(self, within_hours: int = 24) -> List[PostProcessing]:
+    # -------- Пакетная запись (без commit — фиксирует вызывающая транзакция) --------
+    async def bulk_create_posts(self, rows: List[dict]) -> Dict[int, int]:
+        """Upsert постов одного канала, возвращает message_id -> post.id для всех строк,
+        включая уже существовавшие (пустой DO UPDATE нужен, чтобы RETURNING вернул их id)."""
+        post_ids: Dict[int, int] = {}
+        for chunk in _chunks(rows):
+            stmt = pg_insert(Post).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Post.channel_id, Post.message_id],
+                set_={"message_id": stmt.excluded.message_id},
+            ).returning(Post.message_id, Post.id)
+            res = await self.session.execute(stmt)
+            post_ids.update({int(r[0]): int(r[1]) for r in res.all()})
+        return post_ids
+
+    async def bulk_create_keyword_matches(self, pairs: List[Tuple[int, int]]) -> None:
+        rows = [{"post_id": post_id, "keyword_id": kw_id} for post_id, kw_id in pairs]
+        for chunk in _chunks(rows):
+            stmt = pg_insert(PostKeywordMatch).values(chunk).on_conflict_do_nothing(
+                index_elements=[PostKeywordMatch.post_id, PostKeywordMatch.keyword_id]
+            )
+            await self.session.execute(stmt)
+
+    async def bulk_create_processing(self, pairs: List[Tuple[int, int]]) -> List[int]:
+        """Создаёт PENDING-записи обработки, возвращает id созданных."""
+        rows = [
+            {"post_id": post_id, "operator_id": operator_id, "status": PostStatus.PENDING.value}
+            for post_id, operator_id in pairs
+        ]
+        created: List[int] = []
+        for chunk in _chunks(rows):
+            stmt = pg_insert(PostProcessing).values(chunk).on_conflict_do_nothing(
+                index_elements=[PostProcessing.post_id, PostProcessing.operator_id]
+            ).returning(PostProcessing.id)
+            res = await self.session.execute(stmt)
+            created.extend(int(r) for r in res.scalars().all())
+        return created
+
+    async def get_notifications(self, pp_ids: List[int], within_hours: int = 24) -> List:
+        """Данные для уведомлений по записям обработки одним запросом, готовые к рендерингу.
+
+        Строка: pp_id, post_id, telegram_id, language, time_zone, published_at, text,
+        url, channel_title, keywords (тексты ключевых слов в порядке совпадения).
+        Записи, уже обработанные или вышедшие из окна `within_hours`, не возвращаются.
+        """
+        if not pp_ids:
+            return []
         cutoff = datetime.utcnow() - timedelta(hours=within_hours)
+        keywords = (
+            select(func.array_agg(aggregate_order_by(Keyword.text, PostKeywordMatch.id)))
+            .select_from(PostKeywordMatch)
+            .join(Keyword, Keyword.id == PostKeywordMatch.keyword_id)
+            .where(PostKeywordMatch.post_id == Post.id)
+            .correlate(Post)
+            .scalar_subquery()
+        )
         stmt = (
-            select(PostProcessing)
-            .options(
-                selectinload(PostProcessing.post).selectinload(Post.channel),
-                selectinload(PostProcessing.post)
-                    .selectinload(Post.matched_keywords)
-                    .selectinload(PostKeywordMatch.keyword),
+            select(
+                PostProcessing.id.label("pp_id"),
+                Post.id.label("post_id"),
+                User.telegram_id.label("telegram_id"),
+                func.coalesce(UserSettings.language, Language.RU.value).label("language"),
+                func.coalesce(UserSettings.time_zone, TimeZone.GMT.value).label("time_zone"),
+                Post.published_at,
+                Post.text,
+                Post.url,
+                Channel.title.label("channel_title"),
+                keywords.label("keywords"),
             )
+            .select_from(PostProcessing)
+            .join(Post, Post.id == PostProcessing.post_id)
+            .join(Channel, Channel.id == Post.channel_id)
+            .join(User, User.id == PostProcessing.operator_id)
+            .outerjoin(UserSettings, UserSettings.user_id == User.id)
+            .where(PostProcessing.id.in_(pp_ids))
             .where(PostProcessing.status == PostStatus.PENDING.value)
+            .where(PostProcessing.notify_sent_at.is_(None))
             .where(PostProcessing.processed_at.is_(None))
             .where(Post.published_at >= cutoff)
-            .join(Post, Post.id == PostProcessing.post_id)
+            .order_by(PostProcessing.id)
         )
         res = await self.session.execute(stmt)
-        return res.unique().scalars().all()
+        return res.all()
 
     async def get_processing(self, pp_id: int) -> Optional[PostProcessing]:
         stmt = (
@@ -88,6 +131,7 @@ class PostRepository(BaseRepository):
         res = await self.session.execute(stmt)
         obj = res.scalar_one_or_none()
         if obj:
+            await mark_report_hours_dirty(self.session, [obj.post_id])
             await self.session.commit()
         return obj
 
@@ -113,55 +157,43 @@ class PostRepository(BaseRepository):
             stmt = stmt.where(PostProcessing.id != exclude_pp_id)
         stmt = stmt.values(status=new_status, processed_at=datetime.utcnow())
         await self.session.execute(stmt)
+        await mark_report_hours_dirty(self.session, [post_id])
         await self.session.commit()
 
     # -------- Методы для отчётов --------
-    async def count_distinct_posts_with_matches(self, within_hours: Optional[int] = None) -> int:
-        stmt = select(func.count(distinct(Post.id))).select_from(Post).join(PostKeywordMatch, PostKeywordMatch.post_id == Post.id)
-        if within_hours is not None:
-            cutoff = datetime.utcnow() - timedelta(hours=within_hours)
-            stmt = stmt.where(Post.published_at >= cutoff)
-        res = await self.session.execute(stmt)
-        return int(res.scalar() or 0)
-
-    async def count_processing_by_status(self, status: str, within_hours: Optional[int] = None) -> int:
-        stmt = select(func.count()).select_from(PostProcessing).join(Post, Post.id == PostProcessing.post_id)
-        stmt = stmt.where(PostProcessing.status == status)
-        if within_hours is not None:
-            cutoff = datetime.utcnow() - timedelta(hours=within_hours)
-            stmt = stmt.where(Post.published_at >= cutoff)
-        res = await self.session.execute(stmt)
-        return int(res.scalar() or 0)
+    async def stream_report_posts(self, within_hours: int = 24, limit: int = 500, chunk_size: int = 100):
+        """Посты с совпадениями за окно для .docx-отчёта, пачками по `chunk_size` строк
+        (серверный курсор вместо загрузки всех постов со связями в память).
 
-    async def get_operator_stats(self, within_hours: Optional[int] = None) -> List[Tuple[int, int, int]]:
-        """
-        Возвращает список кортежей (operator_id, processed_count, postponed_count)
+        Строка: published_at, text, url, channel_title, channel_username, keywords
+        (тексты ключевых слов в порядке совпадения).
         """
-        base = select(
-            PostProcessing.operator_id,
-            func.sum(case((PostProcessing.status == PostStatus.PROCESSED.value, 1), else_=0)).label("processed"),
-            func.sum(case((PostProcessing.status == PostStatus.POSTPONED.value, 1), else_=0)).label("postponed"),
-        ).select_from(PostProcessing).join(Post, Post.id == PostProcessing.post_id)
-        if within_hours is not None:
-            cutoff = datetime.utcnow() - timedelta(hours=within_hours)
-            base = base.where(Post.published_at >= cutoff)
-        base = base.group_by(PostProcessing.operator_id)
-        res = await self.session.execute(base)
-        rows = res.all() or []
-        return [(int(r[0]), int(r[1] or 0), int(r[2] or 0)) for r in rows]
-
-    async def get_recent_matched_posts(self, within_hours: int = 24) -> List[Post]:
         cutoff = datetime.utcnow() - timedelta(hours=within_hours)
+        keywords = (
+            select(func.array_agg(aggregate_order_by(Keyword.text, PostKeywordMatch.id)))
+            .select_from(PostKeywordMatch)
+            .join(Keyword, Keyword.id == PostKeywordMatch.keyword_id)
+            .where(PostKeywordMatch.post_id == Post.id)
+            .correlate(Post)
+            .scalar_subquery()
+        )
+        has_matches = select(PostKeywordMatch.id).where(PostKeywordMatch.post_id == Post.id).exists()
         stmt = (
-            select(Post)
-            .join(PostKeywordMatch, PostKeywordMatch.post_id == Post.id)
-            .where(Post.published_at >= cutoff)
-            .options(
-                selectinload(Post.channel),
-                selectinload(Post.matched_keywords).selectinload(PostKeywordMatch.keyword),
+            select(
+                Post.published_at,
+                Post.text,
+                Post.url,
+                Channel.title.label("channel_title"),
+                Channel.channel_username,
+                keywords.label("keywords"),
             )
+            .select_from(Post)
+            .join(Channel, Channel.id == Post.channel_id)
+            .where(Post.published_at >= cutoff, has_matches)
             .order_by(Post.published_at.desc())
-            .limit(500)
+            .limit(limit)
+            .execution_options(yield_per=chunk_size)
         )
-        res = await self.session.execute(stmt)
-        return res.unique().scalars().all()
+        res = await self.session.stream(stmt)
+        async for rows in res.partitions(chunk_size):
+            yield rows
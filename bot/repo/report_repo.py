@@ -0,0 +1,253 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select, delete, and_, or_, func, distinct, literal, literal_column, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from bot.models.channel import Channel
+from bot.models.keyword import Keyword
+from bot.models.post import Post, PostKeywordMatch, PostProcessing, PostStatus
+from bot.models.report import ReportDirtyHour, ReportRollup, RollupDimension
+from bot.models.user_model import User
+from bot.repo.base_repo import BaseRepository
+
+
+HOUR = timedelta(hours=1)
+# Единица усечения литералом: одно и то же выражение в SELECT и GROUP BY без bind-параметров
+TRUNC_HOUR = literal_column("'hour'")
+
+
+def floor_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+class OperatorStats(NamedTuple):
+    operator_id: int
+    processed: int
+    postponed: int
+    # Данные пользователя для подписи (None, если пользователь удалён)
+    telegram_id: Optional[int]
+    username: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+
+class ReportStats(NamedTuple):
+    total_channels: int
+    total_keywords: int
+    matched_posts: int
+    processed: int
+    postponed: int
+    pending: int
+    operators: List[OperatorStats]
+
+
+async def mark_report_hours_dirty(session, post_ids: Iterable[int]) -> None:
+    """Ставит в report_dirty_hour часы публикации постов. Вызывается транзакциями,
+    которые пишут посты или меняют статусы обработки, и без commit."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    hour = func.date_trunc(TRUNC_HOUR, Post.published_at)
+    # Одинаковый порядок вставки у всех транзакций — без взаимных блокировок на одних часах
+    hours = select(hour).where(Post.id.in_(post_ids)).distinct().order_by(hour)
+    stmt = pg_insert(ReportDirtyHour).from_select(["bucket"], hours).on_conflict_do_nothing()
+    await session.execute(stmt)
+
+
+def _status_counts():
+    return (
+        func.count().filter(PostProcessing.status == PostStatus.PROCESSED.value),
+        func.count().filter(PostProcessing.status == PostStatus.POSTPONED.value),
+        func.count().filter(PostProcessing.status == PostStatus.PENDING.value),
+    )
+
+
+def _rollup_parts(hour, posts_dim, pp_dim, posts_from, pp_from, where) -> select:
+    """Счётчики одного среза: найденные посты и статусы PostProcessing по (час, id)."""
+    zero = literal_column("0")
+    posts_dim_col = posts_dim if posts_dim is not None else zero
+    pp_dim_col = pp_dim if pp_dim is not None else zero
+    posts_q = (
+        select(hour, posts_dim_col.label("dim_id"), func.count(distinct(Post.id)).label("matched_posts"),
+               zero.label("processed"), zero.label("postponed"), zero.label("pending"))
+        .select_from(posts_from)
+        .where(where)
+        .group_by(hour, *([posts_dim] if posts_dim is not None else []))
+    )
+    processed, postponed, pending = _status_counts()
+    pp_q = (
+        select(hour, pp_dim_col.label("dim_id"), zero.label("matched_posts"),
+               processed.label("processed"), postponed.label("postponed"), pending.label("pending"))
+        .select_from(pp_from)
+        .where(where)
+        .group_by(hour, *([pp_dim] if pp_dim is not None else []))
+    )
+    return union_all(posts_q, pp_q).subquery()
+
+
+class ReportRepository(BaseRepository):
+    """Статистика для отчётов: почасовые счётчики report_rollup и сырые запросы для краёв окна.
+    Методы пересчёта не делают commit — фиксирует вызывающий."""
+    model = ReportRollup
+
+    # -------- Пересчёт почасовых счётчиков --------
+    async def mark_dirty(self, post_ids: Iterable[int]) -> None:
+        """Помечает часы публикации постов к пересчёту (в текущей транзакции)."""
+        await mark_report_hours_dirty(self.session, post_ids)
+
+    async def take_dirty_hours(self, limit: int) -> List[datetime]:
+        """Забирает до `limit` самых ранних помеченных часов. При откате транзакции пересчёта
+        пометки возвращаются; часы, которые держит компактор другой реплики, пропускаются."""
+        claimed = (
+            select(ReportDirtyHour.bucket)
+            .order_by(ReportDirtyHour.bucket)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(ReportDirtyHour).where(ReportDirtyHour.bucket.in_(claimed)).returning(ReportDirtyHour.bucket)
+        res = await self.session.execute(stmt)
+        return [r[0] for r in res.all()]
+
+    async def rebuild_rollup(self, buckets: List[datetime]) -> None:
+        """Пересчитывает строки report_rollup за указанные часы."""
+        if not buckets:
+            return
+        where = or_(*(and_(Post.published_at >= b, Post.published_at < b + HOUR) for b in buckets))
+        await self.session.execute(delete(ReportRollup).where(ReportRollup.bucket.in_(buckets)))
+
+        hour = func.date_trunc(TRUNC_HOUR, Post.published_at).label("bucket")
+        with_matches = Post.__table__.join(PostKeywordMatch, PostKeywordMatch.post_id == Post.id)
+        pp_posts = PostProcessing.__table__.join(Post, Post.id == PostProcessing.post_id)
+        pp_keywords = pp_posts.join(PostKeywordMatch, PostKeywordMatch.post_id == Post.id)
+        parts = {
+            RollupDimension.TOTAL: _rollup_parts(hour, None, None, with_matches, pp_posts, where),
+            RollupDimension.CHANNEL: _rollup_parts(hour, Post.channel_id, Post.channel_id, with_matches, pp_posts, where),
+            RollupDimension.KEYWORD: _rollup_parts(
+                hour, PostKeywordMatch.keyword_id, PostKeywordMatch.keyword_id, with_matches, pp_keywords, where
+            ),
+        }
+        columns = ["bucket", "dimension", "dim_id", "matched_posts", "processed", "postponed", "pending"]
+        selects = [
+            select(
+                sq.c.bucket, literal(dimension.value), sq.c.dim_id, func.sum(sq.c.matched_posts),
+                func.sum(sq.c.processed), func.sum(sq.c.postponed), func.sum(sq.c.pending),
+            ).group_by(sq.c.bucket, sq.c.dim_id)
+            for dimension, sq in parts.items()
+        ]
+        # Для оператора «найденные посты» — назначенные ему записи обработки
+        selects.append(
+            select(hour, literal(RollupDimension.OPERATOR.value), PostProcessing.operator_id, func.count(), *_status_counts())
+            .select_from(pp_posts)
+            .where(where)
+            .group_by(hour, PostProcessing.operator_id)
+        )
+        for sel in selects:
+            stmt = pg_insert(ReportRollup).from_select(columns, sel)
+            # Параллельный компактор другой реплики мог успеть вставить тот же час
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ReportRollup.bucket, ReportRollup.dimension, ReportRollup.dim_id],
+                set_={c: getattr(stmt.excluded, c) for c in columns[3:]},
+            )
+            await self.session.execute(stmt)
+
+    # -------- Чтение --------
+    @staticmethod
+    def _counters_query(published, rollup_window=None) -> select:
+        """Все счётчики отчёта одной строкой: каналы, ключевые слова, найденные посты
+        и статусы обработки (сырые строки по `published` плюс почасовые за `rollup_window`)."""
+        processed, postponed, pending = _status_counts()
+        raw = (
+            select(processed.label("processed"), postponed.label("postponed"), pending.label("pending"))
+            .select_from(PostProcessing)
+            .join(Post, Post.id == PostProcessing.post_id)
+            .where(published)
+            .subquery()
+        )
+        matched = (
+            select(func.count(distinct(Post.id)))
+            .select_from(Post)
+            .join(PostKeywordMatch, PostKeywordMatch.post_id == Post.id)
+            .where(published)
+            .scalar_subquery()
+        )
+        counters = [matched, raw.c.processed, raw.c.postponed, raw.c.pending]
+        froms = [raw]
+        if rollup_window is not None:
+            rolled = (
+                select(
+                    func.coalesce(func.sum(ReportRollup.matched_posts), 0).label("matched_posts"),
+                    func.coalesce(func.sum(ReportRollup.processed), 0).label("processed"),
+                    func.coalesce(func.sum(ReportRollup.postponed), 0).label("postponed"),
+                    func.coalesce(func.sum(ReportRollup.pending), 0).label("pending"),
+                )
+                .where(ReportRollup.dimension == RollupDimension.TOTAL.value, rollup_window)
+                .subquery()
+            )
+            counters = [c + r for c, r in zip(counters, rolled.c)]
+            froms.append(rolled)
+        return select(
+            select(func.count()).select_from(Channel).scalar_subquery(),
+            select(func.count()).select_from(Keyword).scalar_subquery(),
+            *counters,
+        ).select_from(*froms)
+
+    @staticmethod
+    def _operators_query(published, rollup_window=None) -> select:
+        """Статистика по операторам вместе с данными пользователя для подписи."""
+        processed, postponed, _ = _status_counts()
+        parts = (
+            select(
+                PostProcessing.operator_id.label("operator_id"),
+                processed.label("processed"),
+                postponed.label("postponed"),
+            )
+            .select_from(PostProcessing)
+            .join(Post, Post.id == PostProcessing.post_id)
+            .where(published)
+            .group_by(PostProcessing.operator_id)
+        )
+        if rollup_window is not None:
+            parts = union_all(parts, select(ReportRollup.dim_id, ReportRollup.processed, ReportRollup.postponed).where(
+                ReportRollup.dimension == RollupDimension.OPERATOR.value, rollup_window
+            ))
+        sq = parts.subquery()
+        return (
+            select(
+                sq.c.operator_id, func.sum(sq.c.processed), func.sum(sq.c.postponed),
+                User.telegram_id, User.username, User.first_name, User.last_name,
+            )
+            .select_from(sq)
+            .outerjoin(User, User.id == sq.c.operator_id)
+            .group_by(sq.c.operator_id, User.id)
+            .order_by(sq.c.operator_id)
+        )
+
+    async def get_report_stats(self, within_hours: int, rolled_until: Optional[datetime] = None) -> ReportStats:
+        """Счётчики отчёта за последние `within_hours` часов — два запроса независимо
+        от числа операторов.
+
+        Полные часы до `rolled_until` (граница, до которой компактор пересчитал
+        report_rollup) берутся из почасовых строк, неполный первый час окна и всё
+        начиная с `rolled_until` — сырыми запросами. Без `rolled_until` всё окно
+        считается по сырым таблицам.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=within_hours)
+        first_full = floor_hour(cutoff)
+        if first_full < cutoff:
+            first_full += HOUR
+        if rolled_until is None or rolled_until <= first_full:
+            published, rollup_window = Post.published_at >= cutoff, None
+        else:
+            published = or_(
+                and_(Post.published_at >= cutoff, Post.published_at < first_full),
+                Post.published_at >= rolled_until,
+            )
+            rollup_window = and_(ReportRollup.bucket >= first_full, ReportRollup.bucket < rolled_until)
+
+        counters = (await self.session.execute(self._counters_query(published, rollup_window))).one()
+        operators = (await self.session.execute(self._operators_query(published, rollup_window))).all()
+        return ReportStats(
+            *(int(v or 0) for v in counters),
+            [OperatorStats(int(r[0]), int(r[1] or 0), int(r[2] or 0), *r[3:]) for r in operators],
+        )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from sqlalchemy import select, insert, update
+from sqlalchemy import select, insert, update, or_
 from typing import List, Optional
 
 from bot.models.user_model import User, UserRole, UserSettings, TimeZone, Language, UserWhiteList
@@ -71,6 +71,16 @@ class UserRepository(BaseRepository):
     async def get_operators(self, page: int = 1, per_page: int = 10) -> List[User]:
         return await self.list_users(is_operator=True, page=page, per_page=per_page)
 
+    async def get_recipient_ids(self) -> List[int]:
+        """id всех операторов и админов — получателей постов на обработку (без пагинации)."""
+        stmt = (
+            select(User.id)
+            .where(or_(User.is_operator.is_(True), User.role == UserRole.ADMIN.value))
+            .order_by(User.id)
+        )
+        obj = await self.session.execute(stmt)
+        return list(obj.scalars().all())
+
     async def update_user(self, user_id: int, values: dict) -> User | None:
         upd = (
             update(User)
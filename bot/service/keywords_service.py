@@ -9,6 +9,7 @@ from bot.schemas.keyword_schema import (
     KeyWordCreateSchema,
 )
 from bot.service.base_service import BaseService
+from bot.utils.text_normalize import normalize_keyword
 
 
 class KeyWordsService(BaseService):
@@ -27,7 +28,10 @@ class KeyWordsService(BaseService):
         :param word: Текст ключевого слова.
         :return: Созданное ключевое слово.
         """
-        existing_keyword = await self.db.keywords.get_keyword_by_filter(text=word)
+        # Вариант написания уже существующего слова (тире, пробелы, ё/е, регистр) не дублируем
+        existing_keyword = await self.db.keywords.get_keyword_by_normalized(
+            normalize_keyword(word, KeywordType.WORD.value)
+        )
         if existing_keyword:
             return existing_keyword
         payload = KeyWordCreateSchema(
@@ -101,7 +105,9 @@ class KeyWordsService(BaseService):
             return None
 
         # Проверяем, существует ли уже ключевое слово
-        existing_keyword = await self.db.keywords.get_keyword_by_filter(text=proposal.text)
+        existing_keyword = await self.db.keywords.get_keyword_by_normalized(
+            normalize_keyword(proposal.text, KeywordType.WORD.value)
+        )
         if not existing_keyword:
             # Создаем новое ключевое слово
             created = await self.create(proposal.text)
@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from bot.schemas.user_schema import CreateUserSchema, UserSchema
 from bot.service.base_service import BaseService
+from bot.tasks.recipient_cache import recipient_cache
 from bot.models.user_model import User
 from bot.utils.depend import get_atomic_db
 
@@ -65,10 +66,13 @@ class UserService(BaseService):
         if user.role != "admin":
             values["role"] = "operator" if make_operator else "user"
         updated = await self.db.user.update_user(user_id, values)
+        recipient_cache.invalidate()
         return updated
 
     async def set_active(self, user_id: int, is_active: bool) -> User | None:
-        return await self.db.user.update_user(user_id, {"is_active": bool(is_active)})
+        updated = await self.db.user.update_user(user_id, {"is_active": bool(is_active)})
+        recipient_cache.invalidate()
+        return updated
 
     @staticmethod
     async def cheek_user_permissions_static(telegram_id: int, user_role: str) -> bool :
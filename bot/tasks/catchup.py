@@ -0,0 +1,128 @@
+from typing import Dict, List, Set, Tuple
+
+from telethon import TelegramClient, utils
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.functions.messages import GetPeerDialogsRequest
+from telethon.tl.functions.updates import GetChannelDifferenceRequest
+from telethon.tl.types import (
+    ChannelMessagesFilterEmpty,
+    Dialog,
+    InputDialogPeer,
+    Message,
+    PeerChannel,
+    UpdateEditChannelMessage,
+)
+from telethon.tl.types.updates import ChannelDifferenceEmpty, ChannelDifferenceTooLong
+
+# Первый снимок канала без курсора — как раньше, только последние сообщения
+HISTORY_BOOTSTRAP_LIMIT = 200
+# Сообщений истории за один вызов: меньше 3000, иначе Telethon ждёт секунду между страницами
+HISTORY_CHUNK_LIMIT = 1000
+# Размер страницы GetChannelDifference для пользовательских аккаунтов
+DIFFERENCE_PAGE_LIMIT = 100
+# Страниц difference за один вызов — прогресс сохраняется, остаток догонит следующий опрос
+DIFFERENCE_MAX_PAGES = 10
+# Каналов в одном messages.getPeerDialogs
+PEER_DIALOGS_CHUNK = 100
+
+
+def _input_channel(peer):
+    try:
+        return utils.get_input_channel(peer)
+    except TypeError:
+        # Обычная группа (Chat) — у неё нет pts канала
+        return None
+
+
+async def _fetch_history(client: TelegramClient, peer, ch) -> Tuple[list, bool]:
+    """Сообщения после last_parsed_message_id от старых к новым, не больше
+    HISTORY_CHUNK_LIMIT за вызов, чтобы курсор сдвигался даже на большом отставании.
+
+    Возвращает (сообщения, догнали ли канал до конца).
+    """
+    min_id = ch.last_parsed_message_id or 0
+    if not min_id:
+        return [msg async for msg in client.iter_messages(peer, limit=HISTORY_BOOTSTRAP_LIMIT)], True
+    messages = [msg async for msg in client.iter_messages(peer, limit=HISTORY_CHUNK_LIMIT, min_id=min_id, reverse=True)]
+    return messages, len(messages) < HISTORY_CHUNK_LIMIT
+
+
+async def fetch_new_messages(client: TelegramClient, peer, ch) -> Tuple[list, int | None, bool]:
+    """Догоняет канал от сохранённого pts через updates.getChannelDifference.
+
+    Возвращает (новые и отредактированные сообщения, новый pts, догнан ли канал
+    до конца). Неизменившийся канал
+    обходится одним запросом (ChannelDifferenceEmpty). Разрыв любого размера догоняется
+    по частям: за вызов — не больше DIFFERENCE_MAX_PAGES страниц, и возвращается
+    промежуточный pts, который сохраняется вместе с сообщениями. Если разрыв слишком
+    велик для difference (ChannelDifferenceTooLong) или pts ещё не известен, сообщения
+    добираются историей от last_parsed_message_id порциями; pts сервера возвращается
+    только когда история догнана, до этого — None (сдвигается лишь курсор).
+    """
+    input_channel = _input_channel(peer)
+    if input_channel is None:
+        messages, complete = await _fetch_history(client, peer, ch)
+        return messages, None, complete
+
+    pts = getattr(ch, "pts", None)
+    if pts is None:
+        # pts фиксируем до чтения истории: всё, что придёт позже, покроет следующий difference
+        full = await client(GetFullChannelRequest(input_channel))
+        messages, complete = await _fetch_history(client, peer, ch)
+        return messages, full.full_chat.pts if complete else None, complete
+
+    messages: List[Message] = []
+    for _ in range(DIFFERENCE_MAX_PAGES):
+        diff = await client(GetChannelDifferenceRequest(
+            channel=input_channel,
+            filter=ChannelMessagesFilterEmpty(),
+            pts=pts,
+            limit=DIFFERENCE_PAGE_LIMIT,
+            force=True,
+        ))
+        if isinstance(diff, ChannelDifferenceEmpty):
+            return messages, diff.pts, True
+        if isinstance(diff, ChannelDifferenceTooLong):
+            history, complete = await _fetch_history(client, peer, ch)
+            # Пока история не догнана, pts не продвигаем: следующий опрос снова получит TooLong
+            return messages + history, diff.dialog.pts if complete else pts, complete
+        messages.extend(m for m in diff.new_messages if isinstance(m, Message))
+        messages.extend(
+            u.message for u in diff.other_updates
+            if isinstance(u, UpdateEditChannelMessage) and isinstance(u.message, Message)
+        )
+        pts = diff.pts
+        if diff.final:
+            return messages, pts, True
+    return messages, pts, False
+
+
+async def find_unchanged_channels(client: TelegramClient, peers: Dict[int, Tuple[object, object]]) -> Set[int]:
+    """Пакетная предпроверка: id каналов, в которых ничего не изменилось с прошлого опроса.
+
+    `peers` — {id канала Telegram: (канал из БД, InputPeerChannel)}. Один
+    messages.getPeerDialogs отдаёт top_message и pts сразу для сотни каналов.
+    Канал неизменен, если совпал pts (учитывает и правки), а без pts — если
+    top_message не новее last_parsed_message_id. Каналы, по которым диалог
+    не вернулся (аккаунт не участник), считаются изменившимися.
+    """
+    unchanged: Set[int] = set()
+    items = list(peers.items())
+    for i in range(0, len(items), PEER_DIALOGS_CHUNK):
+        chunk = items[i:i + PEER_DIALOGS_CHUNK]
+        res = await client(GetPeerDialogsRequest(peers=[InputDialogPeer(peer) for _, (_, peer) in chunk]))
+        for dialog in res.dialogs:
+            if not isinstance(dialog, Dialog) or not isinstance(dialog.peer, PeerChannel):
+                continue
+            target = peers.get(dialog.peer.channel_id)
+            if target is None:
+                continue
+            ch = target[0]
+            ch_pts = getattr(ch, "pts", None)
+            if dialog.pts is not None and ch_pts is not None:
+                same = dialog.pts == ch_pts
+            else:
+                same = dialog.top_message <= (ch.last_parsed_message_id or 0)
+            if same:
+                unchanged.add(ch.id)
+    return unchanged
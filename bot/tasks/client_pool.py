@@ -0,0 +1,156 @@
+import asyncio
+import time
+from typing import Dict, Iterable, Tuple
+
+from telethon import TelegramClient
+from telethon.errors import UnauthorizedError, AuthKeyError
+from telethon.sessions import StringSession
+
+from app.core.config import settings
+from app.core.logging import main_logger
+
+
+class AccountAuthError(Exception):
+    """Аккаунт не авторизован или сессия отозвана — нужна повторная авторизация."""
+
+
+class AccountBackoff(Exception):
+    """Аккаунт временно пропускается после ошибок соединения или FloodWait."""
+
+
+class TelethonClientPool:
+    """Долгоживущие Telethon-клиенты, по одному на TelethonAccount.id.
+
+    Клиент подключается один раз и переиспользуется между циклами парсинга.
+    Раз в TELETHON_HEALTHCHECK_SEC клиент проверяется запросом get_me,
+    разорванное соединение переподключается с экспоненциальной паузой,
+    а при смене session_string/api_id/api_hash в БД клиент пересоздаётся.
+    """
+
+    def __init__(self):
+        self._clients: Dict[int, TelegramClient] = {}
+        self._fingerprints: Dict[int, tuple] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._failures: Dict[int, int] = {}
+        self._retry_at: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    @staticmethod
+    def _fingerprint(account) -> tuple:
+        return account.session_string or "", str(account.api_id), account.api_hash
+
+    def _lock(self, account_id: int) -> asyncio.Lock:
+        return self._locks.setdefault(account_id, asyncio.Lock())
+
+    def clients(self) -> Dict[int, TelegramClient]:
+        """Текущие подключённые клиенты (без проверок)."""
+        return {acc_id: c for acc_id, c in self._clients.items() if c.is_connected()}
+
+    async def get(self, account) -> TelegramClient:
+        """Возвращает рабочий клиент аккаунта, при необходимости (пере)подключая его."""
+        async with self._lock(account.id):
+            retry_at = self._retry_at.get(account.id, 0.0)
+            if retry_at > time.monotonic():
+                raise AccountBackoff(f"retry in {retry_at - time.monotonic():.0f}s")
+
+            fingerprint = self._fingerprint(account)
+            client = self._clients.get(account.id)
+            if client is not None and self._fingerprints.get(account.id) != fingerprint:
+                main_logger.info(f"Telethon account #{account.id}: session changed, reloading client")
+                await self._drop(account.id)
+                client = None
+
+            try:
+                if client is None:
+                    client = TelegramClient(
+                        StringSession(fingerprint[0]),
+                        int(account.api_id),
+                        account.api_hash,
+                        system_version="4.16.30-vxCUSTOM",
+                    )
+                    self._clients[account.id] = client
+                    self._fingerprints[account.id] = fingerprint
+                    await client.connect()
+                    if not await client.is_user_authorized():
+                        raise AccountAuthError("Аккаунт не авторизован")
+                    self._checked_at[account.id] = time.monotonic()
+                elif not client.is_connected():
+                    await client.connect()
+                    self._checked_at[account.id] = 0.0
+
+                health_every = float(getattr(settings, "TELETHON_HEALTHCHECK_SEC", 300))
+                if time.monotonic() - self._checked_at.get(account.id, 0.0) >= health_every:
+                    await client.get_me(input_peer=True)
+                    self._checked_at[account.id] = time.monotonic()
+            except AccountAuthError:
+                await self._drop(account.id)
+                raise
+            except (UnauthorizedError, AuthKeyError) as e:
+                await self._drop(account.id)
+                raise AccountAuthError(str(e)) from e
+            except Exception:
+                await self._drop(account.id)
+                self._schedule_retry(account.id)
+                raise
+
+            self._failures.pop(account.id, None)
+            return client
+
+    async def acquire(self, accounts: Iterable) -> Tuple[Dict[int, TelegramClient], Dict[int, Exception]]:
+        """Подключает клиенты всех аккаунтов параллельно и закрывает клиенты аккаунтов,
+        которых больше нет в списке. Возвращает (клиенты, ошибки) по id аккаунта."""
+        accounts = list(accounts)
+        await self.prune(a.id for a in accounts)
+        results = await asyncio.gather(*(self.get(a) for a in accounts), return_exceptions=True)
+        clients: Dict[int, TelegramClient] = {}
+        errors: Dict[int, Exception] = {}
+        for account, res in zip(accounts, results):
+            if isinstance(res, BaseException):
+                errors[account.id] = res
+            else:
+                clients[account.id] = res
+        return clients, errors
+
+    def defer(self, account_id: int, seconds: float) -> None:
+        """Не выдавать клиент аккаунта ближайшие `seconds` секунд (например, после FloodWait)."""
+        self._retry_at[account_id] = max(self._retry_at.get(account_id, 0.0), time.monotonic() + seconds)
+
+    async def fail(self, account_id: int) -> None:
+        """Клиент отказал посреди работы: закрываем его и откладываем переподключение."""
+        async with self._lock(account_id):
+            await self._drop(account_id)
+            self._schedule_retry(account_id)
+
+    async def release(self, account_id: int) -> None:
+        async with self._lock(account_id):
+            await self._drop(account_id)
+            self._failures.pop(account_id, None)
+            self._retry_at.pop(account_id, None)
+
+    async def prune(self, keep_ids: Iterable[int]) -> None:
+        keep = set(keep_ids)
+        for account_id in [acc_id for acc_id in self._clients if acc_id not in keep]:
+            await self.release(account_id)
+
+    async def close(self) -> None:
+        await self.prune(())
+
+    def _schedule_retry(self, account_id: int) -> None:
+        failures = self._failures.get(account_id, 0) + 1
+        self._failures[account_id] = failures
+        max_delay = float(getattr(settings, "TELETHON_RECONNECT_BACKOFF_MAX_SEC", 300))
+        delay = min(max_delay, 2 ** failures)
+        self.defer(account_id, delay)
+
+    async def _drop(self, account_id: int) -> None:
+        client = self._clients.pop(account_id, None)
+        self._fingerprints.pop(account_id, None)
+        self._checked_at.pop(account_id, None)
+        if client is not None:
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+
+
+client_pool = TelethonClientPool()
@@ -0,0 +1,75 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import main_logger
+from bot.utils.keyword_matcher import KeywordSpec
+from bot.utils.match_worker import match_batch
+
+
+class MatchPool:
+    """Необязательная стадия сопоставления в пуле процессов (PARSE_MATCH_PROCESSES > 0).
+
+    Пачки (id сообщения, нормализованный текст, мягко нормализованный текст) уходят в ProcessPoolExecutor, чтобы
+    тяжёлые регулярные выражения не блокировали event loop бота. Каждый воркер держит
+    собранный matcher и пересобирает его, только когда меняется версия ключевых слов:
+    задача отправляется без specs, а при несовпадении версии — повторно со specs.
+    """
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def processes(self) -> int:
+        return int(getattr(settings, "PARSE_MATCH_PROCESSES", 0))
+
+    def should_use(self, batch_len: int) -> bool:
+        return self.processes > 0 and batch_len >= int(getattr(settings, "PARSE_MATCH_POOL_MIN_MESSAGES", 50))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, а не fork: у бота уже есть потоки (to_thread, очередь loguru), и
+            # унаследованная в захваченном состоянии блокировка повесит воркер.
+            # Воркер импортирует только bot.utils.match_worker; бот запускается как
+            # `python -m bot`, поэтому spawn не выполняет заново главный модуль
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run_chunk(self, version: str, specs: Sequence[KeywordSpec], chunk: List[Tuple[int, str, str]]):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        result = await loop.run_in_executor(executor, match_batch, version, None, chunk)
+        if result is None:
+            result = await loop.run_in_executor(executor, match_batch, version, list(specs), chunk)
+        return result
+
+    async def match(
+        self,
+        items: List[Tuple[int, str, str]],
+        version: str,
+        specs: Sequence[KeywordSpec],
+    ) -> Dict[int, List[int]]:
+        """Сопоставляет сообщения в пуле: {msg_id: [kw_ids]} для сообщений с совпадениями."""
+        batch_size = max(1, int(getattr(settings, "PARSE_MATCH_BATCH_SIZE", 200)))
+        chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        try:
+            results = await asyncio.gather(*(self._run_chunk(version, specs, chunk) for chunk in chunks))
+        except BrokenProcessPool:
+            main_logger.error("match process pool is broken, recreating")
+            self.close()
+            raise
+        return {msg_id: kw_ids for part in results for msg_id, kw_ids in part}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+match_pool = MatchPool()
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.core.logging import main_logger
+from bot.utils.depend import get_atomic_db
+from bot.utils.keyword_matcher import KeywordMatcher, KeywordSpec, build_keyword_specs
+
+
+class KeywordMatcherCache:
+    """Кэш скомпилированного KeywordMatcher, привязанный к версии таблицы ключевых слов.
+
+    Каждый цикл парсера делает только дешёвый запрос версии. Пока версия не меняется,
+    используется уже собранный matcher. После правки ключевых слов новый matcher
+    собирается в фоне (компиляция — в отдельном потоке), а до готовности
+    продолжает работать предыдущий.
+    """
+
+    def __init__(self):
+        self.version: str | None = None
+        self.specs: list[KeywordSpec] = []
+        self._matcher: KeywordMatcher | None = None
+        self._rebuild_task: asyncio.Task | None = None
+        self._rebuild_version: str | None = None
+
+    @property
+    def current(self) -> KeywordMatcher | None:
+        """Последний собранный matcher без проверки версии (для горячих путей)."""
+        return self._matcher
+
+    async def get(self) -> KeywordMatcher | None:
+        async with get_atomic_db() as db:
+            version = await db.keywords.get_keywords_version()
+        if version == self.version:
+            return self._matcher
+        if self._matcher is None:
+            # Первый запуск — собирать не из чего, ждём сборку
+            await self._rebuild(version)
+            return self._matcher
+        if self._rebuild_version != version:
+            if self._rebuild_task and not self._rebuild_task.done():
+                self._rebuild_task.cancel()
+            self._rebuild_version = version
+            self._rebuild_task = asyncio.create_task(self._rebuild(version))
+        return self._matcher
+
+    async def _rebuild(self, version: str) -> None:
+        try:
+            async with get_atomic_db() as db:
+                keywords = await db.keywords.get_all_keywords()
+            specs = build_keyword_specs(keywords)
+            matcher = await asyncio.to_thread(KeywordMatcher, specs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            main_logger.error(f"keyword matcher rebuild failed: {e}")
+            self._rebuild_version = None
+            return
+        self._matcher, self.specs, self.version = matcher, specs, version
+        main_logger.info(f"Keyword matcher rebuilt: {len(matcher)} keywords, version {version}")
+
+
+keyword_matcher_cache = KeywordMatcherCache()
@@ -1,57 +1,48 @@
 import asyncio
 import re
-from typing import List, Set
+import time
+from typing import Awaitable, Callable, Dict, Set
 from html import escape
 
-from telethon import TelegramClient
-from telethon.sessions import StringSession
-from telethon.errors import RPCError
+from telethon import TelegramClient, utils
+from telethon.errors import (
+    RPCError,
+    UnauthorizedError,
+    AuthKeyError,
+    FloodError,
+    FloodWaitError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    PeerIdInvalidError,
+)
 from telethon.tl.functions.messages import ImportChatInviteRequest, CheckChatInviteRequest
 
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from bot.keyboards.keyboards import get_post_keyboard
 
 from app.core.config import settings
 from app.core.logging import main_logger
-from bot.models.keyword import KeywordType
 from bot.utils.depend import get_atomic_db
+from bot.tasks.catchup import fetch_new_messages, find_unchanged_channels
+from bot.tasks.client_pool import AccountAuthError, AccountBackoff, client_pool
+from bot.tasks.matcher_cache import keyword_matcher_cache
+from bot.tasks.notify_sender import notification_sender
+from bot.tasks.notify_wakeup import notify_wakeup
+from bot.tasks.peer_cache import channel_peer_cache
+from bot.tasks.pipeline import process_channel_messages
+from bot.tasks.poll_scheduler import poll_scheduler
+from bot.tasks.realtime import realtime_ingestor
+from bot.tasks.report_rollup import report_compactor
+from bot.utils.hash_ring import HashRing
+from bot.utils.keyword_matcher import KeywordMatcher
 from bot.utils.time_utils import format_dt, get_dt_format
 from bot.utils.i18n import t
 
 
-def _compile_keyword_patterns(keywords) -> List[tuple[int, str, re.Pattern]]:
-    """Готовим паттерны в нижнем регистре, чтобы сравнивать с text.lower()."""
-    patterns: List[tuple[int, str, re.Pattern]] = []
-    for kw in keywords:
-        if not kw.is_active:
-            continue
-        t = (kw.type or KeywordType.WORD.value)
-        raw_text = kw.text or ""
-        if not raw_text:
-            continue
-        text_l = raw_text.lower()
-        if t == KeywordType.WORD.value:
-            pat = re.compile(rf"\b{re.escape(text_l)}\b")
-        elif t == KeywordType.PHRASE.value:
-            pat = re.compile(re.escape(text_l))
-        elif t == KeywordType.REGEX.value:
-            try:
-                pat = re.compile(text_l)
-            except re.error:
-                main_logger.error(f"Invalid regex keyword #{kw.id}: {raw_text}")
-                continue
-        else:
-            pat = re.compile(re.escape(text_l))
-        patterns.append((kw.id, text_l, pat))
-    return patterns
-
-
-async def _iter_active_channels_and_keywords():
+async def _list_active_channels():
     async with get_atomic_db() as db:
-        channels = await db.channel.list_active_channels()
-        keywords = await db.keywords.get_all_keywords()
-        active_keywords = [k for k in keywords if getattr(k, "is_active", True)]
-    return channels, active_keywords
+        return await db.channel.list_active_channels()
 
 
 async def _select_telethon_accounts():
@@ -59,36 +50,6 @@ async def _select_telethon_accounts():
         return await db.telethon.list_active_accounts()
 
 
-async def _select_telethon_account():
-    async with get_atomic_db() as db:
-        accs = await db.telethon.list_active_accounts()
-        return accs[0] if accs else None
-
-
-def _extract_text_from_message(msg) -> str:
-    try:
-        return (msg.message or msg.raw_text or "")
-    except Exception:
-        return ""
-
-
-def _detect_media_type(msg) -> str | None:
-    try:
-        if msg.photo:
-            return "photo"
-        if msg.video:
-            return "video"
-        if msg.document:
-            return "document"
-        if msg.audio:
-            return "audio"
-        if msg.voice:
-            return "voice"
-    except Exception:
-        pass
-    return None
-
-
 async def _notify_admins_account_problem(account, bot, error_text: str, notified_accounts: Set[int]):
     if account.id in notified_accounts:
         return
@@ -123,6 +84,11 @@ async def _notify_admins_account_problem(account, bot, error_text: str, notified
         main_logger.error(f"_notify_admins_account_problem error: {e}")
 
 
+def _is_account_error(e: Exception) -> bool:
+    """Ошибка относится к аккаунту целиком (авторизация, FloodWait, соединение), а не к каналу."""
+    return isinstance(e, (UnauthorizedError, AuthKeyError, FloodError, ConnectionError))
+
+
 def _clean_username(u: str | None) -> str | None:
     """Normalize a username or t.me URL to a bare username.
     Examples:
@@ -167,6 +133,8 @@ async def _resolve_channel_entity(client: TelegramClient, ch) -> object | None:
         try:
             return await client.get_entity(username)
         except Exception as e:
+            if _is_account_error(e):
+                raise
             main_logger.error(f"get_entity error by username '{username}': {e}")
 
     # 2) Try invite link if provided
@@ -177,6 +145,8 @@ async def _resolve_channel_entity(client: TelegramClient, ch) -> object | None:
             try:
                 return await client.get_entity(pub_username)
             except Exception as e:
+                if _is_account_error(e):
+                    raise
                 main_logger.error(f"get_entity error by public link '{invite_link}': {e}")
 
         # 2b) If it's a private invite link, try to check and import invite
@@ -194,6 +164,8 @@ async def _resolve_channel_entity(client: TelegramClient, ch) -> object | None:
                 except Exception:
                     pass
             except RPCError as e:
+                if _is_account_error(e):
+                    raise
                 main_logger.error(f"invite import failed for '{invite_link}': {e}")
             except Exception as e:
                 main_logger.error(f"invite handling error for '{invite_link}': {e}")
@@ -201,9 +173,187 @@ async def _resolve_channel_entity(client: TelegramClient, ch) -> object | None:
     return None
 
 
+async def _fetch_channel_messages(account_id: int, client: TelegramClient, ch) -> tuple[list, int | None, bool] | None:
+    """Забирает новые сообщения канала: (сообщения, новый pts, догнан ли канал). None — канал недоступен.
+    Сущность канала берётся из кэша channel_peer; полное разрешение — только при промахе
+    или если закэшированный peer стал недействительным."""
+    cached = await channel_peer_cache.get(account_id, ch.id)
+    if cached:
+        try:
+            result = await fetch_new_messages(client, cached.input_peer, ch)
+        except (ChannelInvalidError, ChannelPrivateError, PeerIdInvalidError) as e:
+            main_logger.warning(f"cached peer for channel #{ch.id} is no longer valid, resolving again: {e}")
+            await channel_peer_cache.invalidate(account_id, ch.id)
+        else:
+            realtime_ingestor.watch(account_id, ch, cached.marked_id, cached.is_member)
+            realtime_ingestor.mark_polled(ch.id)
+            return result
+
+    entity = await _resolve_channel_entity(client, ch)
+    if not entity:
+        ref = ch.channel_username or ch.invite_link or 'unknown'
+        main_logger.error(f"resolve channel failed for '{ref}': not found or no access")
+        return None
+    await channel_peer_cache.store(account_id, ch.id, entity)
+    realtime_ingestor.watch(account_id, ch, utils.get_peer_id(entity), not getattr(entity, "left", True))
+    result = await fetch_new_messages(client, entity, ch)
+    realtime_ingestor.mark_polled(ch.id)
+    return result
+
+
+async def _fetch_worker(
+    account_id: int,
+    client: TelegramClient,
+    channels_q: asyncio.Queue,
+    results_q: asyncio.Queue,
+    timeout: float,
+    failures: list,
+):
+    """Воркер пула: берёт каналы из очереди и кладёт (канал, сообщения) в общую очередь результатов.
+    Зависший или упавший канал не блокирует остальные. Ошибка уровня аккаунта
+    останавливает все воркеры этого клиента — его каналы будут переразложены."""
+    while not failures:
+        try:
+            ch = channels_q.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            fetched = await asyncio.wait_for(_fetch_channel_messages(account_id, client, ch), timeout=timeout)
+        except asyncio.TimeoutError:
+            main_logger.error(f"fetch channel #{ch.id} timed out after {timeout}s")
+            poll_scheduler.record_failure(ch.id)
+            continue
+        except Exception as e:
+            if _is_account_error(e):
+                failures.append((e, ch))
+                return
+            main_logger.error(f"fetch channel #{ch.id} failed: {e}")
+            poll_scheduler.record_failure(ch.id)
+            continue
+        if fetched is None:
+            poll_scheduler.record_failure(ch.id)
+            continue
+        messages, pts, caught_up = fetched
+        poll_scheduler.record(ch.id, messages, caught_up)
+        await results_q.put((ch, messages, pts))
+
+
+async def _skip_unchanged_channels(account_id: int, client: TelegramClient, channels: list) -> list:
+    """Отбрасывает каналы без новых сообщений по одному getPeerDialogs на сотню каналов.
+    Проверяются только каналы с закэшированным peer этого аккаунта."""
+    peers = {}
+    for ch in channels:
+        cached = await channel_peer_cache.get(account_id, ch.id)
+        if cached and cached.is_member:
+            peers[cached.peer_id] = (ch, cached.input_peer)
+    if not peers:
+        return channels
+    unchanged = await find_unchanged_channels(client, peers)
+    for ch_id in unchanged:
+        poll_scheduler.record(ch_id, [])
+        realtime_ingestor.mark_polled(ch_id)
+    return [ch for ch in channels if ch.id not in unchanged]
+
+
+async def _scan_shard(
+    account_id: int,
+    client: TelegramClient,
+    channels: list,
+    results_q: asyncio.Queue,
+) -> tuple[list, Exception | None]:
+    """Опрашивает каналы одного аккаунта пулом воркеров.
+    Возвращает (неопрошенные каналы, ошибка аккаунта) — при успехе ([], None)."""
+    concurrency = max(1, int(getattr(settings, "PARSE_CHANNEL_CONCURRENCY", 4)))
+    timeout = float(getattr(settings, "PARSE_CHANNEL_TIMEOUT_SEC", 60))
+
+    try:
+        channels = await _skip_unchanged_channels(account_id, client, channels)
+    except Exception as e:
+        if _is_account_error(e):
+            return list(channels), e
+        main_logger.error(f"dialogs pre-check failed for account #{account_id}, polling all channels: {e}")
+
+    channels_q: asyncio.Queue = asyncio.Queue()
+    for ch in channels:
+        channels_q.put_nowait(ch)
+    failures: list = []
+    await asyncio.gather(*(
+        _fetch_worker(account_id, client, channels_q, results_q, timeout, failures)
+        for _ in range(min(concurrency, len(channels)))
+    ))
+    if not failures:
+        return [], None
+    leftovers = [ch for _, ch in failures]
+    while not channels_q.empty():
+        leftovers.append(channels_q.get_nowait())
+    return leftovers, failures[0][0]
+
+
+async def _results_consumer(results_q: asyncio.Queue, matcher: KeywordMatcher):
+    while True:
+        item = await results_q.get()
+        if item is None:
+            return
+        ch, messages, pts = item
+        try:
+            await process_channel_messages(ch, messages, matcher, pts=pts)
+        except Exception as e:
+            main_logger.error(f"process channel #{ch.id} failed: {e}")
+
+
+async def _scan_channels(
+    clients: Dict[int, TelegramClient],
+    channels: list,
+    matcher: KeywordMatcher,
+    on_account_error: Callable[[int, Exception], Awaitable[None]],
+) -> None:
+    """Раскладывает каналы по аккаунтам консистентным хешированием по id канала и
+    опрашивает шарды параллельно. Каналы аккаунта, отказавшего посреди цикла,
+    переразкладываются на оставшиеся аккаунты. Сопоставление и запись в БД идут
+    в отдельной стадии через общую очередь."""
+    concurrency = max(1, int(getattr(settings, "PARSE_CHANNEL_CONCURRENCY", 4)))
+    results_q: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2 * max(1, len(clients)))
+    consumer = asyncio.create_task(_results_consumer(results_q, matcher))
+    ring = HashRing(clients.keys())
+    pending = list(channels)
+    try:
+        while pending and len(ring):
+            shards = ring.assign(pending, key=lambda ch: ch.id)
+            account_ids = list(shards)
+            outcomes = await asyncio.gather(*(
+                _scan_shard(acc_id, clients[acc_id], shards[acc_id], results_q) for acc_id in account_ids
+            ))
+            pending = []
+            for acc_id, (leftovers, error) in zip(account_ids, outcomes):
+                if error is None:
+                    continue
+                ring.remove(acc_id)
+                pending.extend(leftovers)
+                await on_account_error(acc_id, error)
+        if pending:
+            main_logger.warning(f"{len(pending)} каналов не опрошено: не осталось рабочих Telethon-аккаунтов")
+        await results_q.put(None)
+        await consumer
+    finally:
+        if not consumer.done():
+            consumer.cancel()
+
+
+async def _mark_account_unusable(account, bot, err: str, notified_accounts: Set[int]) -> None:
+    """Помечает аккаунт как неавторизованный и уведомляет админов."""
+    main_logger.error(f"Account {account.phone} unusable: {err}")
+    try:
+        async with get_atomic_db() as db:
+            await db.telethon.update_account(account.id, {"is_authorized": False})
+    except Exception as up_err:
+        main_logger.error(f"mark account unauthorized failed: {up_err}")
+    await _notify_admins_account_problem(account, bot, err, notified_accounts)
+
+
 async def parse_posts_loop(bot):
     """Фоновая задача: парсит посты по активным каналам и создаёт Post/Matches/PostProcessing.
-    При проблемах с аккаунтом помечает его как неавторизованный, уведомляет админов и пытается следующий аккаунт."""
+    Каналы распределяются между всеми рабочими Telethon-аккаунтами. При проблемах с аккаунтом
+    помечает его как неавторизованный, уведомляет админов и отдаёт его каналы остальным."""
     interval = int(getattr(settings, "PARSE_TASK_INTERVAL_SEC", 60))
     notified_accounts: Set[int] = set()
     while True:
@@ -211,208 +361,185 @@ async def parse_posts_loop(bot):
             accounts = await _select_telethon_accounts()
             if not accounts:
                 main_logger.warning("Нет доступных авторизованных Telethon-аккаунтов. Ожидаю…")
+                await client_pool.close()
                 await asyncio.sleep(interval)
                 continue
 
-            # Перебираем аккаунты, пока не найдём рабочий
-            working_client = None
-            working_account = None
-            for account in accounts:
-                client = TelegramClient(StringSession(account.session_string or ""), int(account.api_id), account.api_hash, system_version="4.16.30-vxCUSTOM")
-                try:
-                    await client.connect()
-                    if not await client.is_user_authorized():
-                        raise RuntimeError("Аккаунт не авторизован")
-                    working_client = client
-                    working_account = account
-                    break
-                except Exception as e:
-                    # Помечаем аккаунт как неавторизованный и уведомляем админов
-                    err = f"auth/connect error: {e}"
-                    main_logger.error(f"Account {account.phone} unusable: {err}")
-                    try:
-                        async with get_atomic_db() as db:
-                            await db.telethon.update_account(account.id, {"is_authorized": False})
-                    except Exception as up_err:
-                        main_logger.error(f"mark account unauthorized failed: {up_err}")
-                    await _notify_admins_account_problem(account, bot, err, notified_accounts)
-                    try:
-                        await client.disconnect()
-                    except Exception:
-                        pass
-                    continue
-
-            if not working_client or not working_account:
+            # Берём клиенты из пула; неавторизованные помечаем, остальные ошибки — временные
+            accounts_by_id = {account.id: account for account in accounts}
+            clients, errors = await client_pool.acquire(accounts)
+            for account_id, error in errors.items():
+                account = accounts_by_id[account_id]
+                if isinstance(error, AccountAuthError):
+                    await _mark_account_unusable(account, bot, f"auth/connect error: {error}", notified_accounts)
+                elif not isinstance(error, AccountBackoff):
+                    main_logger.warning(f"Account {account.phone} connect failed, will retry with backoff: {error}")
+
+            if not clients:
                 # Все аккаунты не подошли
                 main_logger.warning("Все Telethon-аккаунты недоступны. Ожидаю появления рабочего…")
                 await asyncio.sleep(interval)
                 continue
 
-            # Есть рабочий клиент — загружаем данные и парсим
-            channels, keywords = await _iter_active_channels_and_keywords()
-            if not channels or not keywords:
-                try:
-                    await working_client.disconnect()
-                except Exception:
-                    pass
-                await asyncio.sleep(interval)
-                continue
-
-            patterns = _compile_keyword_patterns(keywords)
-            if not patterns:
-                try:
-                    await working_client.disconnect()
-                except Exception:
-                    pass
-                await asyncio.sleep(interval)
-                continue
-
-            try:
-                for ch in channels:
-                    entity = await _resolve_channel_entity(working_client, ch)
-                    if not entity:
-                        ref = ch.channel_username or ch.invite_link or 'unknown'
-                        main_logger.error(f"resolve channel failed for '{ref}': not found or no access")
-                        continue
-
-                    min_id = ch.last_parsed_message_id or 0
-                    max_processed_id = min_id
-
-                    async for msg in working_client.iter_messages(entity, limit=200, min_id=min_id):
-                        text = _extract_text_from_message(msg)
-                        text_lower = text.lower() if text else ""
-                        matched_kw_ids: List[int] = []
-                        for kw_id, _, pat in patterns:
-                            if pat.search(text_lower):
-                                matched_kw_ids.append(kw_id)
-                        if not matched_kw_ids:
-                            max_processed_id = max(max_processed_id, msg.id)
-                            continue
-
-                        # Найдено совпадение — сохраняем пост и связи
-                        async with get_atomic_db() as db:
-                            # Проверяем, не создан ли уже пост
-                            existing = await db.post.get_post_by_channel_message(ch.id, msg.id)
-                            if existing:
-                                post = existing
-                            else:
-                                url = None
-                                if ch.channel_username:
-                                    url = f"https://t.me/{ch.channel_username}/{msg.id}"
-                                media_type = _detect_media_type(msg)
-                                post_values = {
-                                    "channel_id": ch.id,
-                                    "message_id": msg.id,
-                                    "text": text,
-                                    "html_text": None,
-                                    "media_type": media_type,
-                                    "media_file_id": None,
-                                    "published_at": msg.date,
-                                    "url": url,
-                                }
-                                post = await db.post.create_post(post_values)
-
-                            # Связи с ключевыми словами
-                            for kid in matched_kw_ids:
-                                try:
-                                    await db.post.create_keyword_match(post.id, kid)
-                                except Exception:
-                                    pass
-
-                            # Назначаем PostProcessing всем операторам и админам
-                            operators = await db.user.get_operators(page=1, per_page=1000)
-                            admins = await db.user.get_admins()
-                            recipients = list({u.id: u for u in [*operators, *admins]}.values())
-                            for u in recipients:
-                                exists_proc = await db.post.get_processing_for_post_operator(post.id, u.id)
-                                if not exists_proc:
-                                    try:
-                                        await db.post.create_processing(post.id, u.id)
-                                    except Exception:
-                                        pass
-
-                        max_processed_id = max(max_processed_id, msg.id)
-
-                    if max_processed_id > (ch.last_parsed_message_id or 0):
-                        async with get_atomic_db() as db:
-                            await db.channel.update_last_parsed(ch.id, max_processed_id)
-                            await db.channel.touch_checked(ch.id)
-
-            finally:
-                try:
-                    await working_client.disconnect()
-                except Exception:
-                    pass
+            async def on_account_error(account_id: int, error: Exception) -> None:
+                account = accounts_by_id[account_id]
+                main_logger.error(f"Account {account.phone} failed during scan, rebalancing its channels: {error}")
+                if isinstance(error, (UnauthorizedError, AuthKeyError)):
+                    await client_pool.release(account_id)
+                    await _mark_account_unusable(account, bot, f"auth error: {error}", notified_accounts)
+                elif isinstance(error, FloodWaitError):
+                    client_pool.defer(account_id, error.seconds)
+                else:
+                    await client_pool.fail(account_id)
+
+            realtime_ingestor.sync_clients(clients)
+
+            # Есть рабочие клиенты — загружаем данные и парсим.
+            # Каналы, покрытые событиями реального времени, опрашиваются только для догонки;
+            # остальные — по расписанию, подстроенному под частоту публикаций канала.
+            channels = await _list_active_channels()
+            realtime_ingestor.retain(ch.id for ch in channels)
+            poll_scheduler.retain(ch.id for ch in channels)
+            channels = poll_scheduler.due([ch for ch in channels if realtime_ingestor.needs_poll(ch)])
+            matcher = await keyword_matcher_cache.get()
+            if channels and matcher:
+                await _scan_channels(clients, channels, matcher, on_account_error)
         except Exception as e:
             main_logger.error(f"parse_posts_loop error: {e}")
         await asyncio.sleep(interval)
 
 
+def _render_notification(row) -> str:
+    """Текст уведомления по строке PostRepository.get_notifications."""
+    lang = row.language
+    fmt = get_dt_format(lang)
+    title = escape(row.channel_title or "Канал")
+    text = row.text or "(без текста)"
+    preview = (text[:400] + "…") if len(text) > 400 else text
+    preview = escape(preview)
+    url = row.url or ""
+
+    # Найденные ключевые слова без повторов, в порядке совпадения
+    kw_texts = list(dict.fromkeys(k for k in (row.keywords or []) if k))
+    kw_line = ("\n" + t(lang, "notify_keywords", kws=", ".join(f"<code>{escape(k)}</code>" for k in kw_texts))) if kw_texts else ""
+
+    return (
+        f"{t(lang, 'notify_found')}\n\n"
+        f"{t(lang, 'notify_channel', title=title)}\n"
+        f"{t(lang, 'notify_date', dt=escape(format_dt(row.published_at, row.time_zone, fmt)))}\n"
+        f"{t(lang, 'notify_link', url=escape(url))}\n"
+        f"{kw_line}\n\n"
+        f"{t(lang, 'notify_text', preview=preview)}"
+    )
+
+
+async def _send_notification(bot, item, row) -> None:
+    """Отправляет одно уведомление и фиксирует результат в очереди отдельной короткой транзакцией."""
+    max_attempts = int(getattr(settings, "NOTIFY_MAX_ATTEMPTS", 5))
+    kb = get_post_keyboard(row.pp_id, row.post_id, row.url or "")
+    try:
+        sent = await notification_sender.send_message(bot, row.telegram_id, _render_notification(row), reply_markup=kb, disable_web_page_preview=True)
+    except Exception as e:
+        main_logger.error(f"notify send failed to {row.telegram_id}: {e}")
+        if item.attempts >= max_attempts:
+            retry_in = None
+        elif isinstance(e, TelegramRetryAfter):
+            # Долгий flood control: раньше указанного Telegram срока повтор бесполезен
+            retry_in = e.retry_after
+        else:
+            # Экспоненциальная пауза между попытками: 30 с, 60 с, 120 с ... не больше часа
+            retry_in = min(3600, 30 * 2 ** (item.attempts - 1))
+        async with get_atomic_db() as db:
+            await db.notification.mark_failed(item.id, str(e), retry_in)
+        return
+    async with get_atomic_db() as db:
+        await db.notification.mark_sent(item.id)
+        await db.post.update_processing_notify_meta(row.pp_id, row.telegram_id, sent.message_id)
+
+
+async def _drain_notification_outbox(bot, lookback_h: int) -> None:
+    """Разбирает очередь уведомлений, пока есть готовые к отправке записи.
+
+    Освободившиеся места сразу занимаются новыми записями, не дожидаясь самого
+    медленного чата; очередь считается пустой, только когда захват ничего не вернул.
+    Пока записи отправляются, их аренда продлевается каждую треть NOTIFY_LEASE_SEC,
+    чтобы другая реплика не забрала их повторно.
+    """
+    batch_size = int(getattr(settings, "NOTIFY_BATCH_SIZE", 100))
+    lease_sec = int(getattr(settings, "NOTIFY_LEASE_SEC", 120))
+    per_chat = int(getattr(settings, "NOTIFY_PER_CHAT_BATCH", 20))
+    renew_every = lease_sec / 3
+    in_flight: Dict[asyncio.Task, int] = {}
+    exhausted = False
+    renew_at = time.monotonic() + renew_every
+    try:
+        while True:
+            if not exhausted and len(in_flight) < batch_size:
+                try:
+                    # Захват пачки и чтение данных — короткая транзакция, отправка идёт уже без неё
+                    async with get_atomic_db() as db:
+                        items = await db.notification.claim(batch_size - len(in_flight), lease_sec, per_chat)
+                        rows = await db.post.get_notifications([i.pp_id for i in items], within_hours=lookback_h)
+                        by_pp = {r.pp_id: r for r in rows}
+                        await db.notification.mark_skipped(i.id for i in items if i.pp_id not in by_pp)
+                except Exception as e:
+                    if not in_flight:
+                        raise
+                    # Начатые отправки доводим до конца и фиксируем, новых не берём
+                    main_logger.error(f"notify claim failed, finishing in-flight sends: {e}")
+                    items, exhausted = [], True
+                # Параллельность и темп отправки ограничивает notification_sender
+                for item in items:
+                    if item.pp_id in by_pp:
+                        in_flight[asyncio.create_task(_send_notification(bot, item, by_pp[item.pp_id]))] = item.id
+                exhausted = exhausted or not items
+            if not in_flight:
+                return
+            done, _ = await asyncio.wait(
+                in_flight, timeout=max(0.0, renew_at - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                in_flight.pop(task)
+                if task.exception() is not None:
+                    main_logger.error(f"notify result save failed: {task.exception()}")
+            if in_flight and time.monotonic() >= renew_at:
+                try:
+                    async with get_atomic_db() as db:
+                        await db.notification.extend_lease(in_flight.values(), lease_sec)
+                except Exception as e:
+                    main_logger.error(f"notify lease renewal failed: {e}")
+                renew_at = time.monotonic() + renew_every
+    finally:
+        # Остаются только при отмене: записи вернутся в очередь по истечении аренды
+        for task in in_flight:
+            task.cancel()
+
+
 async def notify_loop(bot):
-    """Фоновая задача: рассылает уведомления по PostProcessing операторам/админам."""
+    """Фоновая задача: рассылает уведомления по PostProcessing операторам/админам
+    из очереди notification_outbox."""
     interval = int(getattr(settings, "NOTIFY_TASK_INTERVAL_SEC", 120))
     lookback_h = int(getattr(settings, "NOTIFY_LOOKBACK_HOURS", 24))
-    notified: Set[int] = set()  # in-memory защита от повторной отправки за сессию процесса
 
     while True:
         try:
-            async with get_atomic_db() as db:
-                items = await db.post.get_pending_processing(within_hours=lookback_h)
-                for pp in items:
-                    if pp.id in notified:
-                        continue
-                    operator = await db.user.get_user_by_filter(id=pp.operator_id)
-                    if not operator:
-                        notified.add(pp.id)
-                        continue
-                    # Получаем настройки пользователя
-                    st = await db.user.get_or_create_settings(operator.id)
-                    lang = st.language
-                    tz = st.time_zone
-                    fmt = get_dt_format(lang)
-
-                    post = pp.post
-                    ch = post.channel if hasattr(post, "channel") else None
-                    title = escape(getattr(ch, "title", "Канал") or "Канал")
-                    text = post.text or "(без текста)"
-                    preview = (text[:400] + "…") if len(text) > 400 else text
-                    preview = escape(preview)
-                    url = post.url or ""
-
-                    # Собираем найденные ключевые слова
-                    kw_texts = []
-                    try:
-                        for mk in getattr(post, "matched_keywords", []) or []:
-                            if getattr(mk, "keyword", None) and mk.keyword.text:
-                                tkw = mk.keyword.text
-                                if tkw not in kw_texts:
-                                    kw_texts.append(tkw)
-                    except Exception:
-                        pass
-                    kw_line = ("\n" + t(lang, "notify_keywords", kws=", ".join(f"<code>{escape(k)}</code>" for k in kw_texts))) if kw_texts else ""
-
-                    msg_text = (
-                        f"{t(lang, 'notify_found')}\n\n"
-                        f"{t(lang, 'notify_channel', title=title)}\n"
-                        f"{t(lang, 'notify_date', dt=escape(format_dt(post.published_at, tz, fmt)))}\n"
-                        f"{t(lang, 'notify_link', url=escape(url))}\n"
-                        f"{kw_line}\n\n"
-                        f"{t(lang, 'notify_text', preview=preview)}"
-                    )
-                    kb = get_post_keyboard(pp.id, post.id, url)
-                    try:
-                        sent = await bot.send_message(chat_id=operator.telegram_id, text=msg_text, reply_markup=kb, disable_web_page_preview=True)
-                        await db.post.update_processing_notify_meta(pp.id, operator.telegram_id, sent.message_id)
-                        notified.add(pp.id)
-                    except Exception as e:
-                        main_logger.error(f"notify send failed to {operator.telegram_id}: {e}")
+            await _drain_notification_outbox(bot, lookback_h)
         except Exception as e:
             main_logger.error(f"notify_loop error: {e}")
-        await asyncio.sleep(interval)
+        # Просыпаемся по сигналу о новых уведомлениях, интервал — только страховка
+        await notify_wakeup.wait(interval)
 
 
 def start_background_tasks(bot):
     loop = asyncio.get_event_loop()
     loop.create_task(parse_posts_loop(bot))
     loop.create_task(notify_loop(bot))
-    main_logger.info("Background tasks started: parse_posts_loop, notify_loop")
+    if getattr(settings, "NOTIFY_LISTEN_ENABLED", True):
+        loop.create_task(notify_wakeup.listen())
+    if report_compactor.enabled:
+        loop.create_task(report_compactor.run())
+    if realtime_ingestor.enabled:
+        loop.create_task(realtime_ingestor.run())
+        main_logger.info("Background tasks started: parse_posts_loop, notify_loop, realtime ingestion")
+    else:
+        main_logger.info("Background tasks started: parse_posts_loop, notify_loop")
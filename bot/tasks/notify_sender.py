@@ -0,0 +1,55 @@
+import asyncio
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Message
+
+from app.core.config import settings
+from app.core.logging import main_logger
+from bot.utils.rate_limit import KeyedTokenBuckets, TokenBucket
+
+
+class NotificationSender:
+    """Отправка уведомлений в рамках лимитов Bot API.
+
+    Общий token bucket (NOTIFY_GLOBAL_RATE сообщений/с), отдельный bucket на чат
+    (NOTIFY_PER_CHAT_RATE сообщений/с) и не больше NOTIFY_SEND_CONCURRENCY
+    одновременных запросов. На TelegramRetryAfter чат ставится на паузу
+    на указанное Telegram время и отправка повторяется.
+    """
+
+    MAX_RETRY_AFTER = 3
+    # Дольше ждать внутри отправки нельзя — истечёт аренда пачки; повтор уйдёт через очередь
+    MAX_RETRY_AFTER_WAIT_SEC = 30
+
+    def __init__(self):
+        self._global: TokenBucket | None = None
+        self._per_chat: KeyedTokenBuckets | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _ensure(self) -> None:
+        if self._semaphore is not None:
+            return
+        self._global = TokenBucket(float(getattr(settings, "NOTIFY_GLOBAL_RATE", 30)))
+        self._per_chat = KeyedTokenBuckets(float(getattr(settings, "NOTIFY_PER_CHAT_RATE", 1)))
+        self._semaphore = asyncio.Semaphore(int(getattr(settings, "NOTIFY_SEND_CONCURRENCY", 10)))
+
+    async def send_message(self, bot: Bot, chat_id: int, text: str, **kwargs) -> Message:
+        self._ensure()
+        chat_bucket = self._per_chat.get(chat_id)
+        retries = 0
+        while True:
+            await chat_bucket.acquire()
+            await self._global.acquire()
+            async with self._semaphore:
+                try:
+                    return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                except TelegramRetryAfter as e:
+                    if retries >= self.MAX_RETRY_AFTER or e.retry_after > self.MAX_RETRY_AFTER_WAIT_SEC:
+                        raise
+                    retries += 1
+                    main_logger.warning(f"notify to {chat_id}: flood control, retry in {e.retry_after}s")
+                    chat_bucket.pause(e.retry_after)
+
+
+notification_sender = NotificationSender()
@@ -0,0 +1,72 @@
+import asyncio
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.logging import main_logger
+from bot.repo.notification_repo import OUTBOX_CHANNEL
+
+
+class NotifyWakeup:
+    """Будит notify_loop, как только в очереди уведомлений появились записи.
+
+    Стадия сохранения делает pg_notify в своей транзакции (сигнал приходит после
+    commit, в том числе из других процессов), а в своём процессе дополнительно
+    взводит asyncio.Event. Слушатель держит отдельное asyncpg-соединение с LISTEN
+    и переподключается при обрыве; опрос по NOTIFY_TASK_INTERVAL_SEC остаётся
+    страховкой на случай потерянного сигнала.
+    """
+
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def signal(self) -> None:
+        self._event.set()
+
+    async def wait(self, timeout: float) -> None:
+        """Ждёт сигнала не дольше `timeout` секунд."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._event.set()
+
+    async def listen(self) -> None:
+        """Фоновая задача: LISTEN на выделенном соединении с переподключением."""
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(
+                    host=settings.DB_HOST,
+                    port=settings.DB_PORT,
+                    user=settings.DB_USER,
+                    password=settings.DB_PASS,
+                    database=settings.DB_NAME,
+                )
+                await conn.add_listener(OUTBOX_CHANNEL, self._on_notify)
+                main_logger.info(f"Listening for '{OUTBOX_CHANNEL}' notifications")
+                delay = 1.0
+                # Пока слушали не мы, сигнал мог быть потерян — проверяем очередь
+                self._event.set()
+                while not conn.is_closed():
+                    await asyncio.sleep(30)
+                    await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                main_logger.error(f"notify listener error: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+
+notify_wakeup = NotifyWakeup()
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Dict, NamedTuple, Tuple
+
+from telethon import utils
+from telethon.tl.types import Channel, InputPeerChannel
+
+from app.core.logging import main_logger
+from bot.utils.depend import get_atomic_db
+
+
+class CachedPeer(NamedTuple):
+    peer_id: int
+    access_hash: int
+    is_member: bool
+
+    @property
+    def input_peer(self) -> InputPeerChannel:
+        return InputPeerChannel(self.peer_id, self.access_hash)
+
+    @property
+    def marked_id(self) -> int:
+        return utils.get_peer_id(self.input_peer)
+
+
+class ChannelPeerCache:
+    """Кэш разрешённых каналов (peer id + access_hash) по паре (аккаунт, канал).
+
+    Хранится в таблице channel_peer и держится в памяти: по кэшу сразу строится
+    InputPeerChannel, а get_entity/ImportChatInvite (источник FloodWait на
+    ResolveUsername) вызывается только при промахе или ошибке ChannelInvalid.
+    """
+
+    def __init__(self):
+        self._peers: Dict[Tuple[int, int], CachedPeer] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            async with get_atomic_db() as db:
+                rows = await db.channel.list_channel_peers()
+            self._peers = {
+                (r.account_id, r.channel_id): CachedPeer(r.peer_id, r.access_hash, r.is_member) for r in rows
+            }
+            self._loaded = True
+
+    async def get(self, account_id: int, channel_id: int) -> CachedPeer | None:
+        try:
+            await self._ensure_loaded()
+        except Exception as e:
+            main_logger.error(f"channel peer cache load failed: {e}")
+            return None
+        return self._peers.get((account_id, channel_id))
+
+    async def store(self, account_id: int, channel_id: int, entity) -> None:
+        """Запоминает разрешённый канал. Группы без access_hash не кэшируются."""
+        if not isinstance(entity, Channel) or entity.access_hash is None:
+            return
+        peer = CachedPeer(entity.id, entity.access_hash, not getattr(entity, "left", True))
+        if self._peers.get((account_id, channel_id)) == peer:
+            return
+        self._peers[(account_id, channel_id)] = peer
+        try:
+            async with get_atomic_db() as db:
+                await db.channel.upsert_channel_peer(channel_id, account_id, *peer)
+        except Exception as e:
+            main_logger.error(f"save channel peer #{channel_id} for account #{account_id} failed: {e}")
+
+    async def invalidate(self, account_id: int, channel_id: int) -> None:
+        self._peers.pop((account_id, channel_id), None)
+        try:
+            async with get_atomic_db() as db:
+                await db.channel.delete_channel_peer(channel_id, account_id)
+        except Exception as e:
+            main_logger.error(f"delete channel peer #{channel_id} for account #{account_id} failed: {e}")
+
+
+channel_peer_cache = ChannelPeerCache()
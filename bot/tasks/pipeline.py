@@ -0,0 +1,140 @@
+from typing import Dict, List, Tuple
+
+from app.core.logging import main_logger
+from bot.tasks.match_pool import match_pool
+from bot.tasks.matcher_cache import keyword_matcher_cache
+from bot.tasks.notify_wakeup import notify_wakeup
+from bot.tasks.recipient_cache import recipient_cache
+from bot.utils.depend import get_atomic_db
+from bot.utils.keyword_matcher import KeywordMatcher
+from bot.utils.text_normalize import normalize_for_match
+
+
+def extract_text_from_message(msg) -> str:
+    try:
+        return (msg.message or msg.raw_text or "")
+    except Exception:
+        return ""
+
+
+def detect_media_type(msg) -> str | None:
+    try:
+        if msg.photo:
+            return "photo"
+        if msg.video:
+            return "video"
+        if msg.document:
+            return "document"
+        if msg.audio:
+            return "audio"
+        if msg.voice:
+            return "voice"
+    except Exception:
+        pass
+    return None
+
+
+async def save_matched_posts(db, ch, matches: List[Tuple[object, str, List[int]]]) -> int:
+    """Пакетная запись совпадений одного канала в текущей транзакции `db`.
+
+    `matches` — список (сообщение, текст, id ключевых слов). Посты, связи с ключевыми
+    словами и записи PostProcessing для всех операторов и админов пишутся тремя
+    многострочными upsert'ами. Сообщение могло прийти и событием, и при опросе —
+    дубликаты отсекают уникальные индексы (ON CONFLICT), без предварительных SELECT.
+    Возвращает число уведомлений, поставленных в очередь.
+    """
+    if not matches:
+        return 0
+    # Последнее вхождение сообщения побеждает (правка пришла позже исходного текста)
+    by_message: Dict[int, Tuple[object, str, List[int]]] = {m[0].id: m for m in matches}
+
+    post_ids = await db.post.bulk_create_posts([
+        {
+            "channel_id": ch.id,
+            "message_id": message_id,
+            "text": text,
+            "html_text": None,
+            "media_type": detect_media_type(msg),
+            "media_file_id": None,
+            "published_at": msg.date,
+            "url": f"https://t.me/{ch.channel_username}/{message_id}" if ch.channel_username else None,
+        }
+        for message_id, (msg, text, _) in by_message.items()
+    ])
+
+    # Связи с ключевыми словами
+    await db.post.bulk_create_keyword_matches([
+        (post_ids[message_id], kid)
+        for message_id, (_, _, kw_ids) in by_message.items()
+        for kid in dict.fromkeys(kw_ids)
+    ])
+
+    # Назначаем PostProcessing всем операторам и админам
+    recipient_ids = await recipient_cache.get(db)
+    created_pp_ids = await db.post.bulk_create_processing([
+        (post_id, user_id) for post_id in post_ids.values() for user_id in recipient_ids
+    ])
+    # Уведомления ставятся в очередь той же транзакцией, что и записи обработки
+    await db.notification.enqueue(created_pp_ids)
+    # Часы этих постов — к пересчёту почасовой статистики отчётов
+    await db.report.mark_dirty(post_ids.values())
+    return len(created_pp_ids)
+
+
+async def match_messages(messages: list, texts: List[str], matcher: KeywordMatcher) -> Dict[int, List[int]]:
+    """{msg_id: [kw_ids]} для сообщений с совпадениями. Большие пачки сопоставляются
+    в пуле процессов (если он включён), остальное — прямо в event loop."""
+    items = [(msg.id, *normalize_for_match(text or "")) for msg, text in zip(messages, texts)]
+    version = keyword_matcher_cache.version
+    if version and match_pool.should_use(len(items)):
+        try:
+            return await match_pool.match(items, version, keyword_matcher_cache.specs)
+        except Exception as e:
+            main_logger.error(f"process pool matching failed, matching in-process: {e}")
+    result: Dict[int, List[int]] = {}
+    for msg_id, text_norm, regex_text in items:
+        kw_ids = matcher.match(text_norm, regex_text)
+        if kw_ids:
+            result[msg_id] = kw_ids
+    return result
+
+
+async def process_channel_messages(
+    ch,
+    messages: list,
+    matcher: KeywordMatcher,
+    update_cursor: bool = True,
+    pts: int | None = None,
+) -> None:
+    """Стадия сопоставления и сохранения для сообщений одного канала.
+
+    Совпадения всей пачки пишутся одной транзакцией вместе со сдвигом курсора
+    и pts канала. Опрос (update_cursor=True) сдвигает last_parsed_message_id; события
+    реального времени курсор не трогают, чтобы опрос мог догнать пропущенные сообщения.
+    """
+    max_processed_id = ch.last_parsed_message_id or 0
+    texts = [extract_text_from_message(msg) for msg in messages]
+    matched = await match_messages(messages, texts, matcher)
+    matches: List[Tuple[object, str, List[int]]] = []
+    for msg, text in zip(messages, texts):
+        matched_kw_ids = matched.get(msg.id)
+        if matched_kw_ids:
+            matches.append((msg, text, matched_kw_ids))
+        max_processed_id = max(max_processed_id, msg.id)
+
+    move_cursor = update_cursor and max_processed_id > (ch.last_parsed_message_id or 0)
+    move_pts = update_cursor and pts is not None and pts != getattr(ch, "pts", None)
+    if not matches and not move_cursor and not move_pts:
+        return
+    async with get_atomic_db() as db:
+        # Найдены совпадения — сохраняем посты и связи
+        enqueued = await save_matched_posts(db, ch, matches)
+        if move_cursor:
+            await db.channel.update_last_parsed(ch.id, max_processed_id)
+        if move_pts:
+            await db.channel.update_pts(ch.id, pts)
+        if move_cursor or move_pts:
+            await db.channel.touch_checked(ch.id)
+    if enqueued:
+        # Транзакция зафиксирована — рассыльщик в этом процессе может забирать уведомления
+        notify_wakeup.signal()
@@ -0,0 +1,119 @@
+import heapq
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.config import settings
+
+
+@dataclass
+class _PollState:
+    interval: float
+    next_due: float = 0.0
+    last_poll: float | None = None
+    rate: float = 0.0  # сообщений в секунду, экспоненциальное среднее
+
+
+class PollScheduler:
+    """Адаптивный опрос каналов по частоте публикаций.
+
+    Для каждого канала оценивается поток сообщений (число новых сообщений между
+    опросами, на первом опросе — по датам сообщений) и ведётся время следующего
+    опроса в очереди с приоритетом. Активный канал опрашивается примерно вдвое
+    чаще среднего интервала между его постами, но не чаще PARSE_POLL_MIN_INTERVAL_SEC;
+    у тихого канала интервал удваивается после каждого пустого опроса до
+    PARSE_POLL_MAX_INTERVAL_SEC.
+    """
+
+    EWMA_ALPHA = 0.3
+
+    def __init__(self):
+        self._states: Dict[int, _PollState] = {}
+        self._heap: List[Tuple[float, int]] = []
+
+    @property
+    def min_interval(self) -> float:
+        return float(getattr(settings, "PARSE_POLL_MIN_INTERVAL_SEC", 10))
+
+    @property
+    def max_interval(self) -> float:
+        return float(getattr(settings, "PARSE_POLL_MAX_INTERVAL_SEC", 1800))
+
+    def _schedule(self, channel_id: int, state: _PollState, due_at: float) -> None:
+        state.next_due = due_at
+        heapq.heappush(self._heap, (due_at, channel_id))
+
+    def retain(self, channel_ids: Iterable[int]) -> None:
+        """Забывает каналы, которые больше не активны."""
+        keep = set(channel_ids)
+        for channel_id in [cid for cid in self._states if cid not in keep]:
+            del self._states[channel_id]
+
+    def due(self, channels: list) -> list:
+        """Каналы из `channels`, которым пора на опрос. Новые каналы опрашиваются сразу.
+        Выданному каналу сразу назначается следующий срок — если результат опроса
+        не придёт (таймаут, отказ аккаунта), канал вернётся в очередь сам."""
+        now = time.monotonic()
+        by_id = {ch.id: ch for ch in channels}
+        for channel_id in by_id:
+            if channel_id not in self._states:
+                state = self._states[channel_id] = _PollState(interval=self.min_interval)
+                self._schedule(channel_id, state, now)
+
+        result = []
+        postponed = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, channel_id = heapq.heappop(self._heap)
+            state = self._states.get(channel_id)
+            if state is None or state.next_due != due_at:
+                continue  # устаревшая запись кучи
+            if channel_id not in by_id:
+                # Срок подошёл, но канал сейчас отфильтрован (например, покрыт событиями)
+                postponed.append((due_at, channel_id))
+                continue
+            result.append(by_id[channel_id])
+            self._schedule(channel_id, state, now + state.interval)
+        for entry in postponed:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def record(self, channel_id: int, messages: list, caught_up: bool = True) -> None:
+        """Учитывает результат опроса и назначает следующий. Канал, догнанный
+        не до конца (caught_up=False), опрашивается снова через минимальный интервал."""
+        state = self._states.get(channel_id)
+        if state is None:
+            return
+        now = time.monotonic()
+        count = len(messages)
+        if state.last_poll is not None:
+            elapsed = now - state.last_poll
+        elif count:
+            oldest = min(m.date for m in messages)
+            elapsed = (datetime.now(timezone.utc) - oldest).total_seconds()
+        else:
+            elapsed = 0.0
+        if elapsed > 0:
+            observed = count / elapsed
+            state.rate = observed if state.last_poll is None else (
+                (1 - self.EWMA_ALPHA) * state.rate + self.EWMA_ALPHA * observed
+            )
+        state.last_poll = now
+
+        if count and state.rate > 0:
+            interval = 0.5 / state.rate
+        else:
+            interval = state.interval * 2
+        state.interval = min(self.max_interval, max(self.min_interval, interval))
+        self._schedule(channel_id, state, now + (state.interval if caught_up else self.min_interval))
+
+    def record_failure(self, channel_id: int) -> None:
+        """Опрос не удался — повторяем с удвоенной паузой."""
+        state = self._states.get(channel_id)
+        if state is None:
+            return
+        state.interval = min(self.max_interval, state.interval * 2)
+        self._schedule(channel_id, state, time.monotonic() + state.interval)
+
+
+poll_scheduler = PollScheduler()
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import Dict, Iterable, Tuple
+
+from telethon import TelegramClient, events
+
+from app.core.config import settings
+from app.core.logging import main_logger
+from bot.tasks.matcher_cache import keyword_matcher_cache
+from bot.tasks.pipeline import process_channel_messages
+
+
+class RealtimeIngestor:
+    """Push-режим: новые и отредактированные сообщения каналов приходят событиями
+    NewMessage/MessageEdited от клиентов пула и идут в тот же конвейер
+    сопоставления и сохранения, что и опрос.
+
+    Telegram присылает обновления только по каналам, где аккаунт состоит, поэтому
+    канал считается «покрытым», когда опрос разрешил его сущность своим аккаунтом
+    и аккаунт — участник канала. Покрытые каналы опрашиваются не каждый цикл,
+    а раз в PARSE_REALTIME_GAP_FILL_SEC: опрос догоняет пропуски от
+    last_parsed_message_id (например, после переподключения).
+    """
+
+    def __init__(self):
+        self._clients: Dict[int, TelegramClient] = {}
+        self._handlers: Dict[int, object] = {}
+        # marked peer id -> (канал из БД, id аккаунта, который его слушает)
+        self._watched: Dict[int, Tuple[object, int]] = {}
+        self._covered: Dict[int, int] = {}
+        self._polled_at: Dict[int, float] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(getattr(settings, "PARSE_REALTIME_ENABLED", True))
+
+    def sync_clients(self, clients: Dict[int, TelegramClient]) -> None:
+        """Подписывает новые клиенты пула и отписывает пропавшие или пересозданные."""
+        if not self.enabled:
+            return
+        for account_id in [acc_id for acc_id, c in self._clients.items() if clients.get(acc_id) is not c]:
+            self._detach(account_id)
+        for account_id, client in clients.items():
+            if account_id not in self._clients:
+                self._attach(account_id, client)
+
+    def _attach(self, account_id: int, client: TelegramClient) -> None:
+        async def handler(event):
+            await self._on_event(account_id, event)
+
+        client.add_event_handler(handler, events.NewMessage())
+        client.add_event_handler(handler, events.MessageEdited())
+        self._clients[account_id] = client
+        self._handlers[account_id] = handler
+
+    def _detach(self, account_id: int) -> None:
+        client = self._clients.pop(account_id)
+        handler = self._handlers.pop(account_id)
+        try:
+            client.remove_event_handler(handler)
+        except Exception:
+            pass
+        # Без живого клиента покрытие не гарантировано — каналы снова опрашиваются каждый цикл
+        for ch_id in [ch_id for ch_id, acc_id in self._covered.items() if acc_id == account_id]:
+            self._unwatch(ch_id)
+
+    def _unwatch(self, channel_id: int) -> None:
+        self._covered.pop(channel_id, None)
+        self._polled_at.pop(channel_id, None)
+        self._watched = {peer: v for peer, v in self._watched.items() if v[0].id != channel_id}
+
+    def watch(self, account_id: int, ch, peer_id: int, is_member: bool) -> None:
+        """Вызывается опросом после разрешения канала аккаунтом `account_id` (peer_id — marked id)."""
+        if account_id not in self._clients:
+            return
+        if not is_member:
+            # Аккаунт не участник — событий не будет, канал остаётся на опросе
+            self._unwatch(ch.id)
+            return
+        if self._covered.get(ch.id) not in (None, account_id):
+            self._unwatch(ch.id)
+        self._watched[peer_id] = (ch, account_id)
+        self._covered[ch.id] = account_id
+
+    def retain(self, channel_ids: Iterable[int]) -> None:
+        """Перестаёт слушать каналы, которые больше не активны."""
+        keep = set(channel_ids)
+        for ch_id in [ch_id for ch_id in self._covered if ch_id not in keep]:
+            self._unwatch(ch_id)
+
+    def needs_poll(self, ch) -> bool:
+        if ch.id not in self._covered:
+            return True
+        gap_fill = float(getattr(settings, "PARSE_REALTIME_GAP_FILL_SEC", 300))
+        return time.monotonic() - self._polled_at.get(ch.id, 0.0) >= gap_fill
+
+    def mark_polled(self, channel_id: int) -> None:
+        self._polled_at[channel_id] = time.monotonic()
+
+    async def _on_event(self, account_id: int, event) -> None:
+        target = self._watched.get(event.chat_id)
+        if not target or target[1] != account_id:
+            return
+        try:
+            self._queue.put_nowait((target[0], event.message))
+        except asyncio.QueueFull:
+            # Сообщение подберёт ближайший опрос-догонялка
+            main_logger.warning(f"realtime queue full, dropping event for channel #{target[0].id}")
+
+    async def run(self) -> None:
+        """Фоновая задача: прогоняет пришедшие события через конвейер сопоставления."""
+        while True:
+            ch, msg = await self._queue.get()
+            matcher = keyword_matcher_cache.current
+            if not matcher:
+                continue
+            try:
+                await process_channel_messages(ch, [msg], matcher, update_cursor=False)
+            except Exception as e:
+                main_logger.error(f"realtime processing for channel #{ch.id} failed: {e}")
+
+
+realtime_ingestor = RealtimeIngestor()
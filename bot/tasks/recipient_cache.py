@@ -0,0 +1,36 @@
+import time
+from typing import List
+
+from app.core.config import settings
+
+
+class RecipientCache:
+    """Кэш id получателей PostProcessing (все операторы и админы).
+
+    Раньше список перечитывался на каждый найденный пост; теперь — один запрос
+    до смены ролей (UserService.set_operator/set_active сбрасывают кэш)
+    или истечения RECIPIENTS_CACHE_TTL_SEC.
+    """
+
+    def __init__(self):
+        self._ids: List[int] | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        self._ids = None
+        self._generation += 1
+
+    async def get(self, db) -> List[int]:
+        ttl = float(getattr(settings, "RECIPIENTS_CACHE_TTL_SEC", 300))
+        if self._ids is not None and time.monotonic() - self._loaded_at < ttl:
+            return self._ids
+        generation = self._generation
+        ids = await db.user.get_recipient_ids()
+        # Сброс во время загрузки — результат мог устареть, отдаём его, но не кэшируем
+        if generation == self._generation:
+            self._ids, self._loaded_at = ids, time.monotonic()
+        return ids
+
+
+recipient_cache = RecipientCache()
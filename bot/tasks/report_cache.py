@@ -0,0 +1,44 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.core.config import settings
+
+
+class ReportFileCache:
+    """Готовые .docx-отчёты по ключу (окно, язык, TZ) на REPORT_DOCX_CACHE_TTL_SEC.
+
+    Повторные нажатия «📊 Отчёт» от нескольких админов отдают тот же файл,
+    а одновременные запросы с одним ключом ждут одну сборку.
+    """
+
+    def __init__(self):
+        self._files: Dict[Hashable, Tuple[float, bytes]] = {}
+        self._building: Dict[Hashable, asyncio.Task] = {}
+
+    @staticmethod
+    def _ttl() -> float:
+        return float(getattr(settings, "REPORT_DOCX_CACHE_TTL_SEC", 60))
+
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[bytes]]) -> bytes:
+        cached = self._files.get(key)
+        if cached and time.monotonic() - cached[0] < self._ttl():
+            return cached[1]
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.create_task(build())
+            self._building[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # Отмена одного ожидающего не должна прерывать общую сборку
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        self._building.pop(key, None)
+        now = time.monotonic()
+        ttl = self._ttl()
+        self._files = {k: v for k, v in self._files.items() if now - v[0] < ttl}
+        if not task.cancelled() and task.exception() is None:
+            self._files[key] = (now, task.result())
+
+
+report_file_cache = ReportFileCache()
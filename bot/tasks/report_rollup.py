@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.logging import main_logger
+from bot.repo.report_repo import floor_hour
+from bot.utils.depend import get_atomic_db
+
+
+class ReportRollupCompactor:
+    """Фоновый пересчёт почасовых счётчиков report_rollup.
+
+    Пересчитываются только часы, помеченные в report_dirty_hour транзакциями записи
+    постов и смены статусов (история помечается один раз миграцией). Часы берутся
+    пачками по REPORT_ROLLUP_CHUNK_HOURS, каждая — в своей короткой транзакции,
+    чтобы не держать блокировки, которые ждут пишущие транзакции.
+    `rolled_until` — начало часа, до которого счётчики актуальны; отчёт добирает
+    остаток сырыми запросами.
+    """
+
+    def __init__(self):
+        self.rolled_until: datetime | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(getattr(settings, "REPORT_ROLLUP_ENABLED", True))
+
+    async def compact(self) -> None:
+        chunk = max(1, int(getattr(settings, "REPORT_ROLLUP_CHUNK_HOURS", 24)))
+        started = datetime.utcnow()
+        while True:
+            async with get_atomic_db() as db:
+                buckets = await db.report.take_dirty_hours(chunk)
+                await db.report.rebuild_rollup(buckets)
+            if len(buckets) < chunk:
+                break
+        self.rolled_until = floor_hour(started)
+
+    async def run(self) -> None:
+        interval = int(getattr(settings, "REPORT_ROLLUP_INTERVAL_SEC", 60))
+        while True:
+            try:
+                await self.compact()
+            except Exception as e:
+                main_logger.error(f"report rollup compaction failed: {e}")
+            await asyncio.sleep(interval)
+
+
+report_compactor = ReportRollupCompactor()
@@ -5,6 +5,8 @@ from bot.repo.keyword_repo import KeyWordRepo
 from bot.repo.user_repo import UserRepository
 from bot.repo.telethon_repo import TelethonAccountRepository
 from bot.repo.post_repo import PostRepository
+from bot.repo.notification_repo import NotificationRepository
+from bot.repo.report_repo import ReportRepository
 
 
 class DBManager:
@@ -19,6 +21,8 @@ class DBManager:
         self.keywords = KeyWordRepo(self.session)
         self.telethon = TelethonAccountRepository(self.session)
         self.post = PostRepository(self.session)
+        self.notification = NotificationRepository(self.session)
+        self.report = ReportRepository(self.session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -0,0 +1,63 @@
+import bisect
+import hashlib
+from typing import Callable, Dict, Hashable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class HashRing:
+    """Консистентное хеширование: ключ закрепляется за узлом (например, канал за аккаунтом).
+
+    У каждого узла несколько виртуальных точек на кольце, поэтому нагрузка
+    распределяется равномерно, а при добавлении/удалении узла переезжает
+    только его доля ключей.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 64):
+        self._replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[Hashable] = []
+        self._nodes: set = set()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._nodes
+
+    def add(self, node: Hashable) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self._replicas):
+            point = self._hash(f"{node}#{i}")
+            idx = bisect.bisect(self._points, point)
+            self._points.insert(idx, point)
+            self._owners.insert(idx, node)
+
+    def remove(self, node: Hashable) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        keep = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def node_for(self, key: Hashable) -> Hashable:
+        if not self._points:
+            raise LookupError("hash ring is empty")
+        idx = bisect.bisect(self._points, self._hash(str(key))) % len(self._points)
+        return self._owners[idx]
+
+    def assign(self, items: Iterable[T], key: Callable[[T], Hashable]) -> Dict[Hashable, List[T]]:
+        """Раскладывает элементы по узлам: {node: [items...]}."""
+        shards: Dict[Hashable, List[T]] = {}
+        for item in items:
+            shards.setdefault(self.node_for(key(item)), []).append(item)
+        return shards
@@ -0,0 +1,256 @@
+"""Движок сопоставления ключевых слов с текстом постов.
+
+WORD/PHRASE ключевые слова собираются в один автомат Ахо-Корасик, поэтому
+текст сообщения просматривается за один проход независимо от размера списка
+ключевых слов. REGEX ключевые слова объединяются в несколько больших
+альтернатив с именованными группами; подозрительные паттерны проверяются
+по одному («медленная полоса»).
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Без app.core.logging: модуль загружают процессы пула сопоставления, и там не должны
+# появляться файловые обработчики логов; в основном процессе logger уже настроен
+from loguru import logger
+
+from bot.utils.keyword_types import KeywordType
+from bot.utils.text_normalize import normalize_keyword
+
+# (kw_id, нормализованный текст, тип ключевого слова)
+KeywordSpec = Tuple[int, str, str]
+
+# Сколько REGEX ключевых слов объединяется в одну альтернативу
+REGEX_SHARD_SIZE = 100
+
+# Конструкции, которые ломаются или меняют смысл внутри общей альтернативы:
+# обратные ссылки, условные группы, собственные именованные группы.
+_UNSHARDABLE_RE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P[=<]|\(\?\(")
+# Грубая эвристика «катастрофического» бэктрекинга: квантификатор над группой,
+# внутри которой уже есть квантификатор, например (a+)+ или (.*)*.
+_NESTED_QUANTIFIER_RE = re.compile(r"\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)(?:[+*]|\{\d*,)")
+
+
+def _is_word_char(ch: str) -> bool:
+    """То же определение, что и у `\\w` в `re` для str-паттернов."""
+    return ch.isalnum() or ch == "_"
+
+
+def build_keyword_specs(keywords) -> List[KeywordSpec]:
+    """Отбирает активные непустые ключевые слова в нормализованной форме
+    (keyword.normalized_text, а если она ещё не заполнена — вычисляется)."""
+    specs: List[KeywordSpec] = []
+    for kw in keywords:
+        if not getattr(kw, "is_active", True):
+            continue
+        kw_type = kw.type or KeywordType.WORD.value
+        norm = getattr(kw, "normalized_text", None) or normalize_keyword(kw.text or "", kw_type)
+        if not norm:
+            continue
+        specs.append((kw.id, norm, kw_type))
+    return specs
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик над произвольными строками (посимвольно)."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+        for idx, pattern in enumerate(patterns):
+            self._add(idx, pattern)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _add(self, idx: int, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(idx)
+        self._lengths.append(len(pattern))
+
+    def _build_links(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Возвращает все вхождения как (start, end, pattern_idx), включая перекрывающиеся."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                end = i + 1
+                for idx in out[node]:
+                    yield end - lengths[idx], end, idx
+
+
+def _is_slow_regex(source: str) -> bool:
+    if _UNSHARDABLE_RE.search(source) or _NESTED_QUANTIFIER_RE.search(source):
+        return True
+    try:
+        # Например, глобальные флаги `(?i)` допустимы только в начале всего выражения
+        re.compile(f"(?P<k0>{source})")
+    except re.error:
+        return True
+    return False
+
+
+class _RegexShard:
+    """Группа REGEX ключевых слов, собранная в одну альтернативу `(?P<k{id}>...)|...`.
+
+    Общая альтернатива один раз ищет самое раннее попадание любой ветки. До этой
+    позиции не совпадает ни один паттерн группы, поэтому остальные, ещё не найденные
+    ключевые слова проверяются по одному `re.search` начиная с неё: каждый паттерн
+    запускается не больше раза, даже если широкая ветка (`\\w+`) совпадает почти
+    в каждой позиции текста.
+    """
+
+    def __init__(self, items: List[Tuple[int, str]]):
+        self._items = items
+        self._index = {f"k{kw_id}": i for i, (kw_id, _) in enumerate(items)}
+        self._singles = [(kw_id, re.compile(src)) for kw_id, src in items]
+        self.pattern = re.compile("|".join(f"(?P<k{kw_id}>{src})" for kw_id, src in items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _group_index(self, m: re.Match) -> int:
+        name = m.lastgroup
+        if name is None or name not in self._index:
+            name = next(k for k, v in m.groupdict().items() if v is not None and k in self._index)
+        return self._index[name]
+
+    def scan(self, text: str, found: set[int]) -> None:
+        if all(kw_id in found for kw_id, _ in self._items):
+            return
+        m = self.pattern.search(text)
+        if not m:
+            return
+        start = m.start()
+        found.add(self._items[self._group_index(m)][0])
+        for kw_id, pat in self._singles:
+            if kw_id not in found and pat.search(text, start):
+                found.add(kw_id)
+
+
+class KeywordMatcher:
+    """Находит все ключевые слова, встречающиеся в нормализованном тексте (см. text_normalize).
+
+    Семантика совпадает с прежними паттернами: WORD — `\\bслово\\b`,
+    PHRASE и прочие типы — подстрока, REGEX — как `re.search` по каждому паттерну.
+    Порядок возвращаемых id соответствует порядку ключевых слов на входе.
+    """
+
+    def __init__(self, specs: Iterable[KeywordSpec]):
+        self._order: Dict[int, int] = {}
+        # Для каждой уникальной строки автомата: [(kw_id, нужна ли граница слова), ...]
+        self._literal_targets: List[List[Tuple[int, bool]]] = []
+        self._regex_shards: List[_RegexShard] = []
+        self._slow_regex: List[Tuple[int, re.Pattern]] = []
+
+        shardable: List[Tuple[int, str]] = []
+        literal_index: Dict[str, int] = {}
+        for kw_id, text_l, kw_type in specs:
+            if kw_type == KeywordType.REGEX.value:
+                try:
+                    pat = re.compile(text_l)
+                except re.error:
+                    logger.error(f"Invalid regex keyword #{kw_id}: {text_l}")
+                    continue
+                if _is_slow_regex(text_l):
+                    self._slow_regex.append((kw_id, pat))
+                else:
+                    shardable.append((kw_id, text_l))
+            else:
+                idx = literal_index.get(text_l)
+                if idx is None:
+                    idx = literal_index[text_l] = len(self._literal_targets)
+                    self._literal_targets.append([])
+                self._literal_targets[idx].append((kw_id, kw_type == KeywordType.WORD.value))
+            self._order.setdefault(kw_id, len(self._order))
+
+        self._automaton = AhoCorasick(literal_index.keys())
+        self._build_regex_shards(shardable)
+
+    def _build_regex_shards(self, items: List[Tuple[int, str]]) -> None:
+        for i in range(0, len(items), REGEX_SHARD_SIZE):
+            chunk = items[i:i + REGEX_SHARD_SIZE]
+            try:
+                self._regex_shards.append(_RegexShard(chunk))
+            except (re.error, RecursionError, OverflowError) as e:
+                logger.error(f"regex shard compile failed, falling back to single patterns: {e}")
+                self._slow_regex.extend((kw_id, re.compile(src)) for kw_id, src in chunk)
+
+    @classmethod
+    def from_keywords(cls, keywords) -> "KeywordMatcher":
+        return cls(build_keyword_specs(keywords))
+
+    def __len__(self) -> int:
+        return (
+            sum(len(t) for t in self._literal_targets)
+            + sum(len(sh) for sh in self._regex_shards)
+            + len(self._slow_regex)
+        )
+
+    def match(self, text_lower: str, regex_text: str | None = None) -> List[int]:
+        """Возвращает id всех ключевых слов, найденных в тексте.
+
+        `text_lower` — полная нормализация (normalize_text) для слов и фраз,
+        `regex_text` — мягкая (normalize_light) для REGEX; по умолчанию та же строка.
+        """
+        found: set[int] = set()
+        if text_lower:
+            targets = self._literal_targets
+            n = len(text_lower)
+            for start, end, idx in self._automaton.iter_matches(text_lower):
+                boundary_ok = None
+                for kw_id, whole_word in targets[idx]:
+                    if kw_id in found:
+                        continue
+                    if whole_word:
+                        if boundary_ok is None:
+                            boundary_ok = self._has_word_boundaries(text_lower, start, end, n)
+                        if not boundary_ok:
+                            continue
+                    found.add(kw_id)
+        if regex_text is None:
+            regex_text = text_lower
+        for shard in self._regex_shards:
+            shard.scan(regex_text, found)
+        for kw_id, pat in self._slow_regex:
+            if kw_id not in found and pat.search(regex_text):
+                found.add(kw_id)
+        return sorted(found, key=self._order.__getitem__)
+
+    @staticmethod
+    def _has_word_boundaries(text: str, start: int, end: int, n: int) -> bool:
+        """Эквивалент `\\b` по обе стороны вхождения text[start:end]."""
+        before = start > 0 and _is_word_char(text[start - 1])
+        if before == _is_word_char(text[start]):
+            return False
+        after = end < n and _is_word_char(text[end])
+        return after != _is_word_char(text[end - 1])
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class KeywordType(str, Enum):
+    """Типы ключевых слов"""
+    WORD = "word"  # Отдельное слово
+    PHRASE = "phrase"  # Фраза (несколько слов)
+    REGEX = "regex"  # Регулярное выражение
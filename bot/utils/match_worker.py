@@ -0,0 +1,33 @@
+"""Точка входа процессов пула сопоставления (bot.tasks.match_pool).
+
+Процесс, запущенный через spawn, импортирует только этот модуль и движок
+сопоставления: ни настроек, ни БД, ни бота, ни обработчиков логов.
+"""
+from typing import List, Sequence, Tuple
+
+from bot.utils.keyword_matcher import KeywordMatcher, KeywordSpec
+
+# Состояние процесса-воркера: собранный matcher и версия ключевых слов, из которой он собран
+_worker_matcher: KeywordMatcher | None = None
+_worker_version: str | None = None
+
+
+def match_batch(
+    version: str,
+    specs: Sequence[KeywordSpec] | None,
+    items: List[Tuple[int, str, str]],
+) -> List[Tuple[int, List[int]]] | None:
+    """Выполняется в процессе пула. Возвращает [(msg_id, [kw_ids])] только для сообщений
+    с совпадениями; None — у воркера другая версия matcher, нужно прислать specs."""
+    global _worker_matcher, _worker_version
+    if version != _worker_version:
+        if specs is None:
+            return None
+        _worker_matcher = KeywordMatcher(specs)
+        _worker_version = version
+    result = []
+    for msg_id, text_norm, regex_text in items:
+        kw_ids = _worker_matcher.match(text_norm, regex_text)
+        if kw_ids:
+            result.append((msg_id, kw_ids))
+    return result
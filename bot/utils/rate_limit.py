@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import Dict, Hashable
+
+
+class TokenBucket:
+    """Асинхронный token bucket: `rate` токенов в секунду, запас до `capacity`.
+
+    acquire() ждёт, пока появится токен; ожидающие обслуживаются по очереди.
+    pause() запрещает выдачу на заданное время (например, после RetryAfter).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    @property
+    def idle(self) -> bool:
+        """Запас восстановлен полностью и никто не ждёт — бакет можно выбросить."""
+        self._refill(time.monotonic())
+        return self._tokens >= self.capacity and not self._lock.locked() and time.monotonic() >= self._blocked_until
+
+
+class KeyedTokenBuckets:
+    """Отдельный TokenBucket на каждый ключ (например, chat_id); простаивающие удаляются."""
+
+    def __init__(self, rate: float, capacity: float | None = None, max_idle: int = 1000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_idle = max_idle
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def get(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_idle:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.idle}
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+        return bucket
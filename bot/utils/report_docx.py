@@ -0,0 +1,59 @@
+from io import BytesIO
+from typing import Iterable, List
+
+try:
+    from docx import Document as DocxDocument
+except ImportError:  # python-docx не установлен — .docx-отчёт отключается
+    DocxDocument = None
+
+from bot.utils.i18n import t_plain, strip_html
+from bot.utils.time_utils import format_dt, get_dt_format
+
+
+class ReportDocxWriter:
+    """Построчная сборка .docx-отчёта.
+
+    python-docx синхронный и медленный на сотнях абзацев, поэтому все методы
+    вызываются через asyncio.to_thread: шапка, затем пачки постов по мере чтения
+    из БД, затем save() — event loop при этом не блокируется.
+    """
+
+    def __init__(self, lang: str, tz: str, within_hours: int, counters: dict, op_lines: List[str]):
+        self.lang = lang
+        self.tz = tz
+        self.fmt = get_dt_format(lang)
+        doc = DocxDocument()
+        doc.add_heading(t_plain(lang, 'report_title', hours=within_hours), level=0)
+        doc.add_paragraph("")
+        for key, n in counters.items():
+            doc.add_paragraph(t_plain(lang, key, n=n))
+
+        doc.add_heading("Операторы", level=1)
+        if op_lines:
+            for line in op_lines:
+                doc.add_paragraph(strip_html(line), style="List Bullet")
+        else:
+            doc.add_paragraph("—")
+
+        doc.add_heading("Посты", level=1)
+        self.doc = doc
+
+    def add_posts(self, rows: Iterable) -> None:
+        """Строки PostRepository.stream_report_posts."""
+        doc = self.doc
+        for row in rows:
+            doc.add_heading(row.channel_title or row.channel_username or "", level=2)
+            doc.add_paragraph(t_plain(self.lang, 'notify_date', dt=format_dt(row.published_at, self.tz, self.fmt)))
+            if row.url:
+                doc.add_paragraph(f"URL: {row.url}")
+            kw_texts = list(dict.fromkeys(k for k in (row.keywords or []) if k))
+            if kw_texts:
+                doc.add_paragraph("Keywords: " + ", ".join(kw_texts))
+            preview = (row.text or "").strip()
+            doc.add_paragraph(strip_html(preview) if preview else "(no text)")
+            doc.add_paragraph("")
+
+    def save(self) -> bytes:
+        bio = BytesIO()
+        self.doc.save(bio)
+        return bio.getvalue()
@@ -0,0 +1,66 @@
+"""Нормализация текста для сопоставления ключевых слов.
+
+Одна и та же функция применяется к ключевым словам (при сохранении) и к тексту
+постов (перед сопоставлением), поэтому варианты написания сводятся к одной форме:
+NFKC, casefold, ё→е, латинские двойники букв внутри кириллических слов,
+любые тире и дефисы → пробел, схлопывание пробелов, удаление невидимых символов.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+from bot.utils.keyword_types import KeywordType
+
+# Невидимые символы: zero-width space/joiner/non-joiner, word joiner, BOM, мягкий перенос
+_INVISIBLE_RE = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+# Дефисы, тире и минусы всех видов (после NFKC остаются только эти)
+_DASH_RE = re.compile("[\\-\u2010\u2011\u2012\u2013\u2014\u2015\u2212\u2e3a\u2e3b]+")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+_CYRILLIC_RE = re.compile("[\u0400-\u04ff]")
+# Латинские буквы, неотличимые от кириллических (после casefold)
+_HOMOGLYPHS = str.maketrans("aceopxykmthb", "асеорхукмтнв")
+
+
+def _fix_homoglyphs(match: re.Match) -> str:
+    word = match.group(0)
+    if word.isascii() or not _CYRILLIC_RE.search(word):
+        return word
+    return word.translate(_HOMOGLYPHS)
+
+
+def normalize_light(text: str) -> str:
+    """Мягкая нормализация для регулярных выражений: структура текста (тире, пробелы)
+    сохраняется, чтобы не ломать паттерны."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = _INVISIBLE_RE.sub("", text).casefold().replace("ё", "е")
+    return text
+
+
+def normalize_text(text: str) -> str:
+    """Полная нормализация для слов и фраз."""
+    text = normalize_light(text)
+    if not text:
+        return ""
+    text = _WORD_RE.sub(_fix_homoglyphs, text)
+    text = _DASH_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=4096)
+def normalize_for_match(text: str) -> Tuple[str, str]:
+    """(полная форма, мягкая форма) текста поста. Кэшируется: одно и то же сообщение
+    приходит и событием, и при опросе-догонялке, а правки часто не меняют текст."""
+    return normalize_text(text), normalize_light(text)
+
+
+def normalize_keyword(text: str, kw_type: str | None) -> str:
+    """Форма ключевого слова, которая хранится в keyword.normalized_text.
+    Регулярные выражения проверяются по мягкой форме текста поста, поэтому и сами
+    нормализуются мягко (normalize_light) — тире и пробелы в паттерне не трогаются."""
+    if (kw_type or KeywordType.WORD.value) == KeywordType.REGEX.value:
+        return normalize_light(text or "")
+    return normalize_text(text or "")
@@ -0,0 +1,53 @@
+import re
+
+from bot.utils.keyword_matcher import KeywordMatcher
+
+
+class _CountingPattern:
+    """Обёртка над скомпилированным паттерном, считающая вызовы search."""
+
+    def __init__(self, pattern: re.Pattern):
+        self.pattern = pattern
+        self.calls = 0
+
+    def search(self, *args):
+        self.calls += 1
+        return self.pattern.search(*args)
+
+
+def _count_searches(matcher: KeywordMatcher):
+    shard = matcher._regex_shards[0]
+    shard.pattern = _CountingPattern(shard.pattern)
+    shard._singles = [(kw_id, _CountingPattern(p)) for kw_id, p in shard._singles]
+    return shard
+
+
+def test_regex_shard_matches_like_separate_searches():
+    sources = [r"\d{3}-\d{2}", r"(?<=ракет)а", r"^начало", r"бриг\w+", r"нет\s+такого"]
+    specs = [(i, src, "regex") for i, src in enumerate(sources, start=1)]
+    matcher = KeywordMatcher(specs)
+    assert len(matcher._regex_shards) == 1
+    for text in ["начало: ракета и бригада 123-45", "ракета 12-34", "", "после начало"]:
+        expected = [kw_id for kw_id, src, _ in specs if re.search(src, text)]
+        assert matcher.match(text) == expected
+
+
+def test_broad_regex_does_not_rescan_every_position():
+    # \w+ совпадает почти в каждой позиции длинного текста; каждый паттерн группы
+    # должен запускаться не больше раза
+    specs = [(1, r"\w+", "regex")] + [(i, f"k{i}x\\d+", "regex") for i in range(2, 101)]
+    matcher = KeywordMatcher(specs)
+    shard = _count_searches(matcher)
+    text = "слово " * 800 + "k50x7"
+
+    assert matcher.match(text) == [1, 50]
+    assert shard.pattern.calls == 1
+    assert all(p.calls <= 1 for _, p in shard._singles)
+
+
+def test_fully_found_shard_is_skipped():
+    matcher = KeywordMatcher([(1, r"\w+", "regex")])
+    shard = _count_searches(matcher)
+    found = {1}
+    shard.scan("текст " * 100, found)
+    assert shard.pattern.calls == 0
@@ -0,0 +1,36 @@
+import multiprocessing
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from bot.utils.match_worker import match_batch
+
+# Что воркер пула загружать не должен: настройки, БД, модели, бот, логирование приложения
+_PROBE = """
+import sys
+from loguru import logger
+import bot.utils.match_worker
+heavy = sorted(m for m in sys.modules if m.split(".")[0] in {"app", "aiogram", "sqlalchemy", "telethon"}
+               or m == "bot.bot" or m.startswith("bot.models"))
+print(",".join(heavy))
+print(len(logger._core.handlers))
+"""
+
+
+def test_worker_module_imports_only_matcher():
+    out = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True).stdout
+    heavy, handlers = out.splitlines()
+    assert heavy == ""
+    # Только стандартный обработчик loguru (stderr), без файловых
+    assert handlers == "1"
+
+
+def test_match_batch_in_spawned_worker():
+    specs = [(1, "ракета", "word"), (2, r"\d{3}", "regex")]
+    items = [(10, "запуск ракета", "запуск ракета"), (11, "ничего", "ничего"), (12, "код 123", "код 123")]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        assert executor.submit(match_batch, "v1", None, items).result() is None
+        assert executor.submit(match_batch, "v1", specs, items).result() == [(10, [1]), (12, [2])]
+        # Версия совпала — specs повторно не нужны
+        assert executor.submit(match_batch, "v1", None, items[:1]).result() == [(10, [1])]
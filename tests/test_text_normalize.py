@@ -0,0 +1,14 @@
+from bot.utils.keyword_matcher import KeywordMatcher
+from bot.utils.text_normalize import normalize_for_match, normalize_keyword, normalize_light
+
+
+def test_regex_keyword_uses_post_light_normalization():
+    for pattern in [r"Straße\d", r"ＲＰＧ-\d+", "ЁЖ­\\w+", r"ракета\s+[А-Я]"]:
+        assert normalize_keyword(pattern, "regex") == normalize_light(pattern)
+
+
+def test_regex_keyword_matches_spelling_variants():
+    specs = [(1, normalize_keyword(r"Straße\d", "regex"), "regex"), (2, normalize_keyword(r"ＲＰＧ-\d+", "regex"), "regex")]
+    matcher = KeywordMatcher(specs)
+    for text, expected in [("STRASSE7", [1]), ("Straße 7", []), ("замечен rpg-7", [2]), ("ＲＰＧ-26", [2])]:
+        assert matcher.match(*normalize_for_match(text)) == expected